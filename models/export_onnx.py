@@ -0,0 +1,60 @@
+"""
+Export a YOLOv5 helmet model to ONNX for the ONNX Runtime / TensorRT path.
+
+Usage:
+    python models/export_onnx.py --weights models/weights/best.pt --output models/weights/yolov5.onnx
+
+A standalone TensorRT engine can be built from the exported graph with:
+    trtexec --onnx=yolov5.onnx --fp16 --saveEngine=yolov5.engine \\
+        --minShapes=images:1x3x640x640 --optShapes=images:8x3x640x640 \\
+        --maxShapes=images:16x3x640x640
+
+HelmetDetector loads the .onnx file directly; when the TensorRT execution
+provider is available it builds and caches the FP16 engine next to the model.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+INPUT_SIZE = (640, 640)
+
+def export_onnx(weights_path: str, output_path: str, opset: int = 17) -> Path:
+    """Export YOLOv5 weights to an ONNX graph with a dynamic batch axis"""
+    # autoshape=False exports the raw network without the NMS wrapper
+    model = torch.hub.load('ultralytics/yolov5', 'custom', path=weights_path, autoshape=False)
+    model.eval()
+    
+    # Export only the decoded (B, N, 5 + C) inference output, not the per-level feature maps
+    model.model[-1].export = True
+    
+    dummy = torch.zeros(1, 3, *INPUT_SIZE)
+    output_path = Path(output_path)
+    torch.onnx.export(
+        model,
+        dummy,
+        str(output_path),
+        opset_version=opset,
+        input_names=['images'],
+        output_names=['output'],
+        dynamic_axes={'images': {0: 'B'}, 'output': {0: 'B'}}
+    )
+    logger.info(f"Exported ONNX model to {output_path}")
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Export YOLOv5 helmet model to ONNX')
+    parser.add_argument('--weights', required=True, help='Path to YOLOv5 .pt weights')
+    parser.add_argument('--output', default='yolov5.onnx', help='Output .onnx path')
+    parser.add_argument('--opset', type=int, default=17, help='ONNX opset version')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    export_onnx(args.weights, args.output, args.opset)
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,29 @@ import tensorflow as tf
 import numpy as np
 from pathlib import Path
 import logging
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def _as_path(path: Union[str, Path]) -> Path:
+    """Convert a configured path to a Path, reusing earlier conversions"""
+    return Path(path)
+
 class ModelLoader:
     """Handles loading and management of detection models"""
     
     def __init__(self, config: Dict):
-        self.model_path = Path(config['MODEL_PATH'])
-        self.config_path = Path(config.get('CONFIG_PATH', ''))
-        self.weights_path = Path(config.get('WEIGHTS_PATH', ''))
+        self.model_path = _as_path(config['MODEL_PATH'])
+        self.config_path = _as_path(config.get('CONFIG_PATH', ''))
+        self.weights_path = _as_path(config.get('WEIGHTS_PATH', ''))
+        self.input_size = tuple(config.get('INPUT_SIZE', (416, 416)))
+        self.enable_xla = config.get('ENABLE_XLA', True)
+        self.warmup_runs = config.get('WARMUP_RUNS', 2)
         self.detection_graph = None
         self.session = None
+        self.tensors = {}
         
     def load_frozen_graph(self) -> Optional[tf.Graph]:
         """Load frozen inference graph"""
@@ -28,7 +38,9 @@ class ModelLoader:
                     tf.import_graph_def(od_graph_def, name='')
                     
             self.detection_graph = detection_graph
-            self.session = tf.Session(graph=detection_graph)
+            self.session = tf.Session(graph=detection_graph, config=self._session_config())
+            self.tensors = self.get_tensors()
+            self.warmup()
             logger.info("Model loaded successfully")
             return detection_graph
             
@@ -36,6 +48,30 @@ class ModelLoader:
             logger.error(f"Error loading model: {e}")
             return None
             
+    def _session_config(self) -> tf.ConfigProto:
+        """Build the session config used for inference"""
+        cfg = tf.ConfigProto()
+        cfg.gpu_options.allow_growth = True
+        if self.enable_xla:
+            # Input shape is fixed, so JIT-compiled clusters are reused across frames
+            cfg.graph_options.optimizer_options.global_jit_level = tf.OptimizerOptions.ON_1
+        return cfg
+        
+    def warmup(self):
+        """Run dummy inferences so autotuning happens before the first real frame"""
+        if not self.tensors or self.warmup_runs <= 0:
+            return
+            
+        try:
+            height, width = self.input_size
+            dummy = np.zeros((1, height, width, 3), dtype=np.uint8)
+            fetches = {k: v for k, v in self.tensors.items() if k != 'image_tensor'}
+            for _ in range(self.warmup_runs):
+                self.session.run(fetches, feed_dict={self.tensors['image_tensor']: dummy})
+            logger.info(f"Model warmed up with {self.warmup_runs} runs")
+        except Exception as e:
+            logger.error(f"Error warming up model: {e}")
+            
     def load_yolo_weights(self) -> bool:
         """Load YOLO weights and configuration"""
         try:
@@ -74,7 +110,7 @@ class ModelLoader:
     def run_inference(self, image: np.ndarray) -> Dict:
         """Run inference on an image"""
         try:
-            tensors = self.get_tensors()
+            tensors = self.tensors or self.get_tensors()
             if not tensors:
                 return {}
                 
@@ -114,17 +150,41 @@ class ModelManager:
         self.config = config
         self.models = {}
         
+        # Loaders shared between model types that point at the same graph
+        self._by_path: Dict[str, ModelLoader] = {}
+        self._refcounts: Dict[str, int] = {}
+        
+    @staticmethod
+    def _path_key(model_config: Dict) -> str:
+        """Cache key for a model configuration"""
+        return str(_as_path(model_config['MODEL_PATH']).resolve())
+        
+    def _load_shared(self, model_config: Dict) -> Optional[ModelLoader]:
+        """Load a model, reusing an already loaded graph with the same path"""
+        key = self._path_key(model_config)
+        loader = self._by_path.get(key)
+        if loader is None:
+            loader = ModelLoader(model_config)
+            if not loader.load_frozen_graph():
+                return None
+            self._by_path[key] = loader
+        else:
+            logger.info(f"Reusing loaded model for {key}")
+            
+        self._refcounts[key] = self._refcounts.get(key, 0) + 1
+        return loader
+        
     def load_models(self):
         """Load all required models"""
         try:
             # Load helmet detection model
-            helmet_model = ModelLoader(self.config['helmet_model'])
-            if helmet_model.load_frozen_graph():
+            helmet_model = self._load_shared(self.config['helmet_model'])
+            if helmet_model:
                 self.models['helmet'] = helmet_model
                 
             # Load license plate model
-            plate_model = ModelLoader(self.config['plate_model'])
-            if plate_model.load_frozen_graph():
+            plate_model = self._load_shared(self.config['plate_model'])
+            if plate_model:
                 self.models['plate'] = plate_model
                 
             return len(self.models) > 0
@@ -137,7 +197,20 @@ class ModelManager:
         """Get specific model by type"""
         return self.models.get(model_type)
         
+    def release_model(self, model_type: str):
+        """Drop a model type, cleaning up its loader once no type uses it"""
+        model = self.models.pop(model_type, None)
+        if model is None:
+            return
+            
+        key = str(model.model_path.resolve())
+        self._refcounts[key] -= 1
+        if self._refcounts[key] == 0:
+            del self._refcounts[key]
+            del self._by_path[key]
+            model.cleanup()
+        
     def cleanup(self):
         """Clean up all models"""
-        for model in self.models.values():
-            model.cleanup()
\ No newline at end of file
+        for model_type in list(self.models):
+            self.release_model(model_type)
@@ -24,8 +24,8 @@ PATHS = {
 
 # Model configuration
 MODEL_CONFIG = {
-    'MODEL_PATH': MODELS_DIR / 'frozen_inference_graph.pb',
-    'LABEL_MAP_PATH': MODELS_DIR / 'labelmap.pbtxt',
+    'MODEL_PATH': str(MODELS_DIR / 'frozen_inference_graph.pb'),
+    'LABEL_MAP_PATH': str(MODELS_DIR / 'labelmap.pbtxt'),
     'INPUT_SIZE': (416, 416),
     'CHANNELS': 3,
     'BATCH_SIZE': 1
@@ -49,7 +49,8 @@ DATABASE_CONFIG = {
     'DB_PATH': PATHS['DATABASE_PATH'],
     'POOL_SIZE': 5,
     'TIMEOUT': 30,
-    'ENABLE_FOREIGN_KEYS': True
+    # Off: violations are recorded for OCR'd plates that have no vehicle_owners row
+    'ENABLE_FOREIGN_KEYS': False
 }
 
 # Email configuration
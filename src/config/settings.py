@@ -9,6 +9,12 @@ from pathlib import Path
 from typing import Dict, Optional, Union
 from .constants import PATHS, MODEL_CONFIG, DETECTION_CONFIG, DATABASE_CONFIG, EMAIL_CONFIG
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
 logger = logging.getLogger(__name__)
 
 class ConfigurationManager:
@@ -24,7 +30,7 @@ class ConfigurationManager:
         try:
             if self.config_path.exists():
                 with open(self.config_path, 'r') as f:
-                    self.config = yaml.safe_load(f)
+                    self.config = yaml.load(f, Loader=_Loader)
                 logger.info(f"Configuration loaded from {self.config_path}")
             else:
                 self.config = self._get_default_config()
@@ -40,7 +46,7 @@ class ConfigurationManager:
         """Save current configuration to file"""
         try:
             with open(self.config_path, 'w') as f:
-                yaml.safe_dump(self.config, f, default_flow_style=False)
+                yaml.dump(self.config, f, Dumper=_Dumper, default_flow_style=False)
             logger.info(f"Configuration saved to {self.config_path}")
         except Exception as e:
             logger.error(f"Error saving configuration: {e}")
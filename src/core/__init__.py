@@ -3,20 +3,24 @@ Core module for Helmet Detection System.
 Contains the main processing and detection components.
 """
 
-from .model import YOLOModel, DetectionModel
-from .detector import ViolationDetector, LicensePlateDetector
+from .model import YOLOModel, DetectionModel, Detections
+from .detector import HelmetDetector, ViolationDetector, LicensePlateDetector
 from .processor import ImageProcessor, VideoProcessor, FrameProcessor
+from .workers import WorkerPool
 
 __version__ = '1.0.0'
 
 __all__ = [
     'YOLOModel',
     'DetectionModel',
+    'Detections',
+    'HelmetDetector',
     'ViolationDetector',
     'LicensePlateDetector',
     'ImageProcessor',
     'VideoProcessor',
-    'FrameProcessor'
+    'FrameProcessor',
+    'WorkerPool'
 ]
 
 # Default configuration for core components
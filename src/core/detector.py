@@ -0,0 +1,653 @@
+import cv2
+import torch
+import queue
+import logging
+import hashlib
+import threading
+import numpy as np
+import pytesseract
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Union
+
+from .model import YOLOModel, Detections
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Label names (from helmet.names or DETECTION_CONFIG) grouped by role
+HELMET_LABELS = {'helmet', 'with_helmet'}
+NO_HELMET_LABELS = {'no_helmet', 'without_helmet'}
+MOTORCYCLE_LABELS = {'motorcycle'}
+PLATE_LABELS = {'license_plate'}
+
+DEFAULT_CLASSES = {
+    1: 'helmet',
+    2: 'no_helmet',
+    3: 'motorcycle',
+    4: 'license_plate'
+}
+
+def _hash_image(image: np.ndarray) -> Tuple:
+    """Content key for an image: shape, dtype and a 64-bit hash of the pixels"""
+    data = np.ascontiguousarray(image)
+    if XXHASH_AVAILABLE:
+        digest = xxhash.xxh3_64_intdigest(data)
+    else:
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+    return data.shape, data.dtype.str, digest
+
+class HelmetDetector:
+    def __init__(self, model_path: str, conf_thresh: float = 0.5, batch_size: int = 8,
+                 buffer_size: int = 10, iou_thresh: float = 0.45,
+                 frame_skip: Optional[int] = None, config: Optional[Dict] = None):
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.half = False
+        self.session = None
+        self.model = self.load_model(model_path)
+        self.conf_thresh = conf_thresh
+        self.iou_thresh = iou_thresh
+        self.batch_size = max(1, batch_size)
+        self.buffer_size = max(self.batch_size, buffer_size)
+        
+        # Detect on every (frame_skip + 1)-th frame, reuse boxes in between
+        if frame_skip is None:
+            # System config ('processing' section) or a flat processing config
+            processing = (config or {}).get('processing', config or {})
+            frame_skip = processing.get('FRAME_SKIP', 0)
+        self.frame_skip = max(0, frame_skip)
+        
+        # Page-locked uint8 staging buffer: frames cross PCIe as raw bytes
+        # and are converted/scaled on the device
+        self._host = None
+        if self.device.type == 'cuda' and self.session is None:
+            self._host = torch.empty(
+                (self.batch_size, 3, 640, 640), dtype=torch.uint8, pin_memory=True
+            )
+            # Uploads run on their own stream; the event marks when the
+            # pinned buffer has been read and may be refilled
+            self._copy_stream = torch.cuda.Stream()
+            self._copy_done = torch.cuda.Event()
+        
+    def load_model(self, model_path: str) -> torch.nn.Module:
+        """Load YOLOv5 model (PyTorch weights, or an exported .onnx graph)"""
+        if Path(model_path).suffix == '.onnx':
+            self.session = self._load_onnx(model_path)
+            return None
+            
+        model = torch.hub.load('ultralytics/yolov5', 'custom', path=model_path)
+        model.to(self.device)
+        model.eval()
+        
+        if self.device.type == 'cuda':
+            # FP16 weights/activations; input shape is fixed so let cuDNN autotune
+            model.half()
+            self.half = True
+            torch.backends.cudnn.benchmark = True
+            
+        return model
+        
+    def _load_onnx(self, model_path: str):
+        """Create an ONNX Runtime session, preferring TensorRT FP16 on CUDA"""
+        import onnxruntime as ort
+        
+        providers = []
+        available = ort.get_available_providers()
+        if 'TensorrtExecutionProvider' in available:
+            providers.append(('TensorrtExecutionProvider', {
+                'trt_fp16_enable': True,
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': str(Path(model_path).parent)
+            }))
+        if 'CUDAExecutionProvider' in available:
+            providers.append('CUDAExecutionProvider')
+        providers.append('CPUExecutionProvider')
+        
+        session = ort.InferenceSession(model_path, providers=providers)
+        self._input_name = session.get_inputs()[0].name
+        return session
+        
+    def preprocess_image(self, images: List[np.ndarray]) -> torch.Tensor:
+        """Preprocess a list of images into a single (B, 3, 640, 640) batch"""
+        if self.device.type != 'cuda':
+            # BGR->RGB swap, resize, scaling and NCHW layout in one native call
+            blob = cv2.dnn.blobFromImages(
+                images,
+                1.0 / 255.0,
+                (640, 640),
+                swapRB=True,
+                crop=False
+            )
+            return torch.from_numpy(blob)
+            
+        # Same call without scaling, kept as uint8 for a 4x smaller upload
+        blob = cv2.dnn.blobFromImages(
+            images,
+            1.0,
+            (640, 640),
+            swapRB=True,
+            crop=False,
+            ddepth=cv2.CV_8U
+        )
+        batch = torch.from_numpy(blob)
+        
+        if self._host is not None and len(images) <= self.batch_size:
+            # Wait for the previous upload to finish reading the pinned buffer
+            self._copy_done.synchronize()
+            staged = self._host[:len(images)]
+            staged.copy_(batch)
+            
+            with torch.cuda.stream(self._copy_stream):
+                batch = staged.to(self.device, non_blocking=True)
+                self._copy_done.record(self._copy_stream)
+                
+            # Compute waits for the upload; the allocator must know the
+            # tensor is used outside the stream it was allocated on
+            compute_stream = torch.cuda.current_stream()
+            compute_stream.wait_stream(self._copy_stream)
+            batch.record_stream(compute_stream)
+        else:
+            batch = batch.to(self.device, non_blocking=True)
+            
+        batch = batch.half() if self.half else batch.float()
+        return batch.div_(255.0)
+        
+    def detect(self, image: np.ndarray) -> List[Dict]:
+        """Detect helmets in image"""
+        return self.detect_batch([image])[0]
+        
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """Detect helmets in a batch of frames with a single forward pass"""
+        if self.session is not None:
+            return self._detect_batch_onnx(frames)
+            
+        batch = self.preprocess_image(frames)
+        
+        # A tensor input bypasses AutoShape's NMS and rescaling, so the raw
+        # (B, N, 5 + C) output is decoded the same way as the ONNX path
+        with torch.no_grad():
+            raw = self.model(batch)
+        if isinstance(raw, (list, tuple)):
+            raw = raw[0]
+        raw = raw.float().cpu().numpy()
+        
+        return [self._postprocess_raw(pred, frame.shape) for pred, frame in zip(raw, frames)]
+        
+    def _detect_batch_onnx(self, frames: List[np.ndarray]) -> List[List[Dict]]:
+        """Run a batch through the ONNX Runtime session"""
+        blob = cv2.dnn.blobFromImages(frames, 1.0 / 255.0, (640, 640), swapRB=True, crop=False)
+        raw = self.session.run(None, {self._input_name: blob})[0]
+        return [self._postprocess_raw(pred, frame.shape) for pred, frame in zip(raw, frames)]
+        
+    def _postprocess_raw(self, pred: np.ndarray, frame_shape: Tuple[int, ...]) -> List[Dict]:
+        """Decode raw (N, 5 + C) YOLOv5 output rows, scale to the frame and apply NMS"""
+        class_scores = pred[:, 5:] * pred[:, 4:5]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(pred)), class_ids]
+        
+        keep = scores >= self.conf_thresh
+        if not keep.any():
+            return []
+        pred, class_ids, scores = pred[keep], class_ids[keep], scores[keep]
+        
+        # Center/size boxes to top-left/size for NMSBoxes, undoing the
+        # stretch to 640x640 so boxes are in frame pixels
+        frame_h, frame_w = frame_shape[:2]
+        gain = np.array([frame_w, frame_h, frame_w, frame_h], dtype=np.float32) / 640.0
+        boxes = np.stack([
+            pred[:, 0] - pred[:, 2] / 2,
+            pred[:, 1] - pred[:, 3] / 2,
+            pred[:, 2],
+            pred[:, 3]
+        ], axis=1) * gain
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(),
+                                   self.conf_thresh, self.iou_thresh)
+        
+        detections = []
+        for i in np.asarray(indices, dtype=np.int64).reshape(-1):
+            x, y, w, h = boxes[i]
+            detections.append({
+                'bbox': (int(x), int(y), int(x + w), int(y + h)),
+                'confidence': float(scores[i]),
+                'class_id': int(class_ids[i])
+            })
+        return detections
+        
+    def draw_detections(self, image: np.ndarray, detections: List[Dict]) -> np.ndarray:
+        """Draw bounding boxes on image"""
+        img_copy = image.copy()
+        
+        for det in detections:
+            x1, y1, x2, y2 = det['bbox']
+            conf = det['confidence']
+            class_id = det['class_id']
+            
+            # Draw bbox
+            cv2.rectangle(img_copy, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            
+            # Draw label
+            label = f"Helmet: {conf:.2f}"
+            cv2.putText(img_copy, label, (x1, y1-10), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                       
+        return img_copy
+        
+    def process_video(self, video_path: str, output_path: str = None, display: bool = True):
+        """Process video for helmet detection"""
+        cap = cv2.VideoCapture(video_path)
+        
+        if output_path:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            out = cv2.VideoWriter(output_path, fourcc, 30.0, 
+                                (int(cap.get(3)), int(cap.get(4))))
+        
+        # Decode -> inference -> draw/write run as a pipeline so the model
+        # is never idle while frames are being read or displayed
+        q_in = queue.Queue(maxsize=self.buffer_size)
+        q_out = queue.Queue(maxsize=self.buffer_size)
+        stop = threading.Event()
+        
+        # Worker failures end the stream early; they are re-raised here once joined
+        errors: List[Exception] = []
+        
+        decoder = threading.Thread(target=self._decode_frames,
+                                   args=(cap, q_in, stop, errors))
+        inference = threading.Thread(target=self._infer_frames,
+                                     args=(q_in, q_out, stop, errors))
+        decoder.daemon = True
+        inference.daemon = True
+        decoder.start()
+        inference.start()
+        
+        try:
+            # Drawing and display stay on the calling thread (HighGUI requirement)
+            while True:
+                item = q_out.get()
+                if item is None:
+                    break
+                frame, detections = item
+                
+                # Draw results
+                frame_with_det = self.draw_detections(frame, detections)
+                
+                if output_path:
+                    out.write(frame_with_det)
+                
+                if display:
+                    cv2.imshow('Helmet Detection', frame_with_det)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+        finally:
+            stop.set()
+            decoder.join()
+            inference.join()
+            
+            cap.release()
+            if output_path:
+                out.release()
+            if display:
+                cv2.destroyAllWindows()
+                
+        if errors:
+            raise errors[0]
+            
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+        """Put an item on a bounded queue, giving up once stop is set"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+        
+    def _decode_frames(self, cap: cv2.VideoCapture, q_in: queue.Queue,
+                       stop: threading.Event, errors: List[Exception]):
+        """Producer: read frames from the capture into the input queue"""
+        try:
+            while cap.isOpened() and not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if not self._put(q_in, frame, stop):
+                    return
+        except Exception as e:
+            logger.error(f"Frame decoding failed: {e}")
+            errors.append(e)
+        finally:
+            # EOF sentinel
+            self._put(q_in, None, stop)
+        
+    def _infer_frames(self, q_in: queue.Queue, q_out: queue.Queue,
+                      stop: threading.Event, errors: List[Exception]):
+        """Consumer: run batched detection and forward results in order"""
+        skip_mod = self.frame_skip + 1
+        frame_idx = 0
+        last_detections: List[Dict] = []
+        eof = False
+        try:
+            while not eof and not stop.is_set():
+                # Block for the first frame, then drain until batch_size
+                # frames are due for detection
+                pending = []
+                to_detect = 0
+                try:
+                    frame = q_in.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                while frame is not None:
+                    due = frame_idx % skip_mod == 0
+                    frame_idx += 1
+                    pending.append((frame, due))
+                    to_detect += due
+                    if to_detect == self.batch_size:
+                        break
+                    try:
+                        frame = q_in.get_nowait()
+                    except queue.Empty:
+                        break
+                eof = frame is None
+                
+                batch = [f for f, due in pending if due]
+                results = iter(self.detect_batch(batch) if batch else [])
+                
+                # Skipped frames reuse the most recent detections
+                for f, due in pending:
+                    if due:
+                        last_detections = next(results)
+                    if not self._put(q_out, (f, last_detections), stop):
+                        return
+        except Exception as e:
+            logger.error(f"Inference failed: {e}")
+            errors.append(e)
+        finally:
+            # EOF sentinel
+            self._put(q_out, None, stop)
+
+def _flatten_config(config: Dict) -> Dict:
+    """Accept either a flat detector config or the sectioned system config"""
+    if 'model' in config and 'detection' in config:
+        flat = dict(config['model'])
+        flat.update(config['detection'])
+        return flat
+    return config
+
+class ViolationDetector:
+    """Detects helmet and triple-riding violations with the TensorFlow model"""
+    
+    def __init__(self, config: Dict):
+        config = _flatten_config(config)
+        self.min_confidence = config.get('MIN_CONFIDENCE', 0.5)
+        self.input_size = tuple(config.get('INPUT_SIZE', (416, 416)))
+        self.max_riders = config.get('MAX_RIDERS', 2)
+        
+        # Score floor applied inside the model; thresholds at or above it are pure filters
+        self.raw_confidence = config.get('RAW_CONFIDENCE_THRESHOLD', self.min_confidence)
+        if self.raw_confidence > self.min_confidence:
+            raise ValueError(
+                f"RAW_CONFIDENCE_THRESHOLD ({self.raw_confidence}) must not exceed "
+                f"MIN_CONFIDENCE ({self.min_confidence})"
+            )
+        
+        # Resolve class ids for each role once
+        self.classes = self._load_classes(config)
+        self.helmet_ids = self._ids_for(HELMET_LABELS)
+        self.no_helmet_ids = self._ids_for(NO_HELMET_LABELS)
+        self.motorcycle_ids = self._ids_for(MOTORCYCLE_LABELS)
+        self.head_ids = np.concatenate([self.helmet_ids, self.no_helmet_ids])
+        
+        self.model = YOLOModel({
+            'MODEL_PATH': config['MODEL_PATH'],
+            'CONFIDENCE_THRESHOLD': self.raw_confidence,
+            'NMS_THRESHOLD': config.get('NMS_THRESHOLD', 0.4),
+            'INTRA_OP_THREADS': config.get('INTRA_OP_THREADS', 0),
+            'INTER_OP_THREADS': config.get('INTER_OP_THREADS', 2)
+        })
+        
+        # Opt-in LRU of raw detections keyed by pixel hash; off by default since
+        # hashing every frame costs more than it saves on live video
+        self.cache_size = config.get('DETECTION_CACHE_SIZE', 0)
+        self._detection_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Opt-in LRU of preprocessed inputs for direct preprocess_image callers;
+        # shares the detection cache lock
+        self.preprocess_cache_size = config.get('PREPROCESS_CACHE_SIZE', 0)
+        self._preprocess_cache = OrderedDict()
+        
+    @staticmethod
+    def _load_classes(config: Dict) -> Dict[int, str]:
+        """Load class names from a Darknet .names file, else from config"""
+        label_path = Path(config.get('LABEL_MAP_PATH', ''))
+        if label_path.suffix == '.names' and label_path.exists():
+            with open(label_path, 'r') as f:
+                names = [line.strip() for line in f if line.strip()]
+            # The graph emits 1-based label map ids; line i of the file is id i + 1
+            return dict(enumerate(names, start=1))
+        return dict(config.get('CLASSES', DEFAULT_CLASSES))
+        
+    def _ids_for(self, labels: set) -> np.ndarray:
+        """Class ids whose names belong to the given role"""
+        return np.array(
+            [class_id for class_id, name in self.classes.items() if name in labels],
+            dtype=np.int32
+        )
+        
+    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        """Resize to the model input size and convert BGR to RGB"""
+        if not self.preprocess_cache_size:
+            return self._preprocess(image)
+            
+        key = _hash_image(image)
+        with self._cache_lock:
+            processed = self._preprocess_cache.get(key)
+            if processed is not None:
+                self._preprocess_cache.move_to_end(key)
+                
+        if processed is None:
+            # Preprocess outside the lock so other threads are not held up
+            processed = self._preprocess(image)
+            with self._cache_lock:
+                self._preprocess_cache[key] = processed
+                if len(self._preprocess_cache) > self.preprocess_cache_size:
+                    self._preprocess_cache.popitem(last=False)
+                    
+        # Callers get their own copy so the cached entry cannot be mutated
+        return processed.copy()
+        
+    def _preprocess(self, image: np.ndarray) -> np.ndarray:
+        """Uncached preprocessing"""
+        # Resize and channel swap in one call; the graph takes uint8 HWC, so view the blob as such
+        blob = cv2.dnn.blobFromImage(
+            image,
+            scalefactor=1.0,
+            size=self.input_size,
+            swapRB=True,
+            crop=False,
+            ddepth=cv2.CV_8U
+        )
+        return blob[0].transpose(1, 2, 0)
+        
+    def raw_detect(self, image: np.ndarray) -> Detections:
+        """Run the model once, keeping every detection above the raw score floor"""
+        # With caching on, results share read-only arrays with the cache entry;
+        # each caller still gets its own Detections object
+        key = None
+        if self.cache_size:
+            key = _hash_image(image)
+            with self._cache_lock:
+                cached = self._detection_cache.get(key)
+                if cached is not None:
+                    self._detection_cache.move_to_end(key)
+                    return cached[:]
+                    
+        # The detection cache already covers repeats, so skip the preprocess cache
+        processed = self._preprocess(image)
+        detections = self.model.detect(processed, image.shape[:2])
+        
+        if key is not None:
+            for array in (detections.boxes, detections.scores, detections.class_ids):
+                array.setflags(write=False)
+            with self._cache_lock:
+                self._detection_cache[key] = detections
+                if len(self._detection_cache) > self.cache_size:
+                    self._detection_cache.popitem(last=False)
+            return detections[:]
+        return detections
+        
+    def filter_detections(self, detections: Detections,
+                          min_confidence: Optional[float] = None) -> List[Dict]:
+        """Apply a confidence threshold to raw detections with one vectorized mask"""
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        elif min_confidence < self.raw_confidence:
+            # Scores below the raw floor were already dropped inside the model
+            raise ValueError(
+                f"min_confidence {min_confidence} is below the raw detection floor "
+                f"{self.raw_confidence}; lower RAW_CONFIDENCE_THRESHOLD"
+            )
+        results = detections[detections.scores >= min_confidence].to_dicts()
+        for result in results:
+            result['class_name'] = self.classes.get(result['class_id'])
+        return results
+        
+    def detect_objects(self, image: np.ndarray) -> List[Dict]:
+        """Detect objects, returning boxes in original image coordinates"""
+        return self.filter_detections(self.raw_detect(image))
+        
+    def check_violations(self, detections: Union[Detections, List[Dict]]) -> List[Dict]:
+        """Find violations; violation boxes are (x1, y1, x2, y2)"""
+        if not len(detections):
+            return []
+            
+        # Struct-of-arrays input is used as is; dicts are gathered once
+        if isinstance(detections, Detections):
+            # (x, y, w, h) -> (x1, y1, x2, y2)
+            corners = detections.boxes.astype(np.float32)
+            corners[:, 2:] += corners[:, :2]
+            scores = detections.scores
+            class_ids = detections.class_ids
+        else:
+            # Dict boxes from detect_objects are already (x1, y1, x2, y2)
+            corners = np.array([d['bbox'] for d in detections], dtype=np.float32)
+            scores = np.array([d['confidence'] for d in detections], dtype=np.float32)
+            class_ids = np.array([d['class_id'] for d in detections], dtype=np.int32)
+            
+        violations = []
+        
+        # Every bare head is a no-helmet violation
+        for i in np.flatnonzero(np.isin(class_ids, self.no_helmet_ids)):
+            violations.append({
+                'type': 'no_helmet',
+                'confidence': float(scores[i]),
+                'bbox': tuple(int(v) for v in corners[i])
+            })
+            
+        # Count heads over each motorcycle in one broadcast
+        moto_idx = np.flatnonzero(np.isin(class_ids, self.motorcycle_ids))
+        head_idx = np.flatnonzero(np.isin(class_ids, self.head_ids))
+        if len(moto_idx) and len(head_idx):
+            riders = self._count_riders(corners[moto_idx], corners[head_idx])
+            for i, count in zip(moto_idx, riders):
+                if count > self.max_riders:
+                    violations.append({
+                        'type': 'triple_riding',
+                        'confidence': float(scores[i]),
+                        'bbox': tuple(int(v) for v in corners[i]),
+                        'rider_count': int(count)
+                    })
+                    
+        return violations
+        
+    @staticmethod
+    def _count_riders(motorcycles: np.ndarray, heads: np.ndarray) -> np.ndarray:
+        """Count head centers inside each motorcycle's rider region"""
+        head_cx = (heads[:, 0] + heads[:, 2]) / 2
+        head_cy = (heads[:, 1] + heads[:, 3]) / 2
+        
+        # Riders' heads sit above the bike, so extend the box up by its height
+        x1, y1, x2, y2 = (motorcycles[:, k, None] for k in range(4))
+        top = y1 - (y2 - y1)
+        
+        inside = (
+            (head_cx[None, :] >= x1) & (head_cx[None, :] <= x2) &
+            (head_cy[None, :] >= top) & (head_cy[None, :] <= y2)
+        )
+        return inside.sum(axis=1)
+        
+    def close(self):
+        """Release model resources"""
+        self.model.close()
+
+class LicensePlateDetector:
+    """Locates license plates with contour analysis and reads them with OCR"""
+    
+    def __init__(self, config: Dict):
+        config = _flatten_config(config)
+        self.min_plate_area = config.get('MIN_PLATE_AREA', 1000)
+        self.plate_aspect_ratio = config.get('PLATE_ASPECT_RATIO', 3.0)
+        self.aspect_tolerance = config.get('PLATE_ASPECT_TOLERANCE', 1.5)
+        self.max_candidates = config.get('MAX_PLATE_CANDIDATES', 5)
+        self.ocr_config = config.get('OCR_CONFIG', '--psm 7')
+        
+    def detect_plate(self,
+                     image: np.ndarray,
+                     bbox: Optional[Tuple[int, int, int, int]] = None) -> List[Dict]:
+        """Find and read plates, optionally within an (x1, y1, x2, y2) region"""
+        offset_x, offset_y = 0, 0
+        if bbox is not None:
+            x1, y1, x2, y2 = map(int, bbox)
+            image = image[max(y1, 0):y2, max(x1, 0):x2]
+            offset_x, offset_y = max(x1, 0), max(y1, 0)
+        if image.size == 0:
+            return []
+            
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.bilateralFilter(gray, 11, 17, 17)
+        edges = cv2.Canny(gray, 30, 200)
+        contours, _ = cv2.findContours(edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return []
+            
+        # Measure every contour once, then filter candidates with masks
+        rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32)
+        areas = np.array([cv2.contourArea(c) for c in contours], dtype=np.float32)
+        aspect = rects[:, 2] / np.maximum(rects[:, 3], 1)
+        keep = (
+            (areas > self.min_plate_area) &
+            (np.abs(aspect - self.plate_aspect_ratio) < self.aspect_tolerance)
+        )
+        
+        # OCR only the largest few survivors
+        candidates = np.flatnonzero(keep)
+        candidates = candidates[np.argsort(-areas[candidates])][:self.max_candidates]
+        
+        plates = []
+        for x, y, w, h in rects[candidates]:
+            text = self._read_text(gray[y:y + h, x:x + w])
+            if text:
+                plates.append({
+                    'license_plate': text,
+                    'plate_bbox': (
+                        int(x + offset_x),
+                        int(y + offset_y),
+                        int(x + w + offset_x),
+                        int(y + h + offset_y)
+                    )
+                })
+        return plates
+        
+    def _read_text(self, plate_image: np.ndarray) -> str:
+        """Run OCR on a plate crop and keep only alphanumerics"""
+        try:
+            text = pytesseract.image_to_string(plate_image, config=self.ocr_config)
+            return ''.join(ch for ch in text if ch.isalnum()).upper()
+        except Exception as e:
+            logger.error(f"Error reading plate text: {e}")
+            return ''
@@ -1,20 +1,82 @@
 import cv2
 import numpy as np
 import tensorflow as tf
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Union
+
+@lru_cache(maxsize=None)
+def _as_path(path: Union[str, Path]) -> Path:
+    """Convert a configured path to a Path, reusing earlier conversions"""
+    return Path(path)
+
+@dataclass
+class Detections:
+    """Detections for one image stored as parallel arrays (struct-of-arrays)"""
+    
+    __slots__ = ('boxes', 'scores', 'class_ids', 'class_names')
+    
+    boxes: np.ndarray                     # (N, 4) int32 as x, y, w, h
+    scores: np.ndarray                    # (N,) float32
+    class_ids: np.ndarray                 # (N,) int32, 1-based label map ids
+    class_names: Optional[np.ndarray]     # (N,) object, None until classified
+    
+    @classmethod
+    def empty(cls) -> 'Detections':
+        """Create an empty detection set"""
+        return cls(
+            boxes=np.empty((0, 4), dtype=np.int32),
+            scores=np.empty((0,), dtype=np.float32),
+            class_ids=np.empty((0,), dtype=np.int32),
+            class_names=None
+        )
+        
+    def __len__(self) -> int:
+        return len(self.scores)
+        
+    def __getitem__(self, index: Union[np.ndarray, slice]) -> 'Detections':
+        """Select a subset with a boolean mask, index array or slice"""
+        return Detections(
+            boxes=self.boxes[index],
+            scores=self.scores[index],
+            class_ids=self.class_ids[index],
+            class_names=None if self.class_names is None else self.class_names[index]
+        )
+        
+    def to_dicts(self) -> List[Dict]:
+        """Convert to the list-of-dicts format used at the API boundary
+        
+        Dict boxes are (x1, y1, x2, y2), the convention shared with
+        check_violations and the Visualizer.
+        """
+        corners = self.boxes.astype(np.int64)
+        corners[:, 2:] += corners[:, :2]
+        detections = []
+        for i in range(len(self)):
+            detection = {
+                'class_id': int(self.class_ids[i]),
+                'confidence': float(self.scores[i]),
+                'bbox': tuple(int(v) for v in corners[i])
+            }
+            if self.class_names is not None:
+                detection['class_name'] = self.class_names[i]
+            detections.append(detection)
+        return detections
 
 class YOLOModel:
     """YOLO model wrapper for helmet detection"""
     
     def __init__(self, config: Dict):
-        self.model_path = Path(config['MODEL_PATH'])
+        self.model_path = _as_path(config['MODEL_PATH'])
         self.confidence_threshold = config['CONFIDENCE_THRESHOLD']
         self.nms_threshold = config['NMS_THRESHOLD']
+        self.intra_op_threads = config.get('INTRA_OP_THREADS', 0)
+        self.inter_op_threads = config.get('INTER_OP_THREADS', 2)
         self.model = self._load_model()
         
     def _load_model(self) -> tf.Graph:
-        """Load the YOLO model"""
+        """Load the YOLO model and open a persistent session on it"""
         detection_graph = tf.Graph()
         with detection_graph.as_default():
             od_graph_def = tf.GraphDef()
@@ -22,6 +84,20 @@ class YOLOModel:
                 serialized_graph = fid.read()
                 od_graph_def.ParseFromString(serialized_graph)
                 tf.import_graph_def(od_graph_def, name='')
+                
+        # Create the session once and reuse it for every frame
+        session_config = tf.ConfigProto(
+            intra_op_parallelism_threads=self.intra_op_threads,
+            inter_op_parallelism_threads=self.inter_op_threads
+        )
+        self.session = tf.Session(graph=detection_graph, config=session_config)
+        
+        # Cache tensor handles
+        self.image_tensor = detection_graph.get_tensor_by_name('image_tensor:0')
+        self.boxes_t = detection_graph.get_tensor_by_name('detection_boxes:0')
+        self.scores_t = detection_graph.get_tensor_by_name('detection_scores:0')
+        self.classes_t = detection_graph.get_tensor_by_name('detection_classes:0')
+        
         return detection_graph
         
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
@@ -36,79 +112,82 @@ class YOLOModel:
         return blob
         
     def postprocess_detections(
-        self, 
-        detections: np.ndarray, 
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        classes: np.ndarray,
         image_shape: Tuple[int, int]
-    ) -> List[Dict]:
-        """Process raw detections into structured format"""
-        processed_detections = []
-        
-        for detection in detections:
-            confidence = detection[4]
-            if confidence > self.confidence_threshold:
-                class_id = np.argmax(detection[5:])
-                center_x = int(detection[0] * image_shape[1])
-                center_y = int(detection[1] * image_shape[0])
-                width = int(detection[2] * image_shape[1])
-                height = int(detection[3] * image_shape[0])
-                
-                # Calculate bounding box coordinates
-                x = int(center_x - width/2)
-                y = int(center_y - height/2)
-                
-                processed_detections.append({
-                    'class_id': class_id,
-                    'confidence': float(confidence),
-                    'bbox': (x, y, width, height)
-                })
-                
-        return self._apply_nms(processed_detections)
+    ) -> Detections:
+        """Convert Object Detection API outputs for one image into pixel-space detections"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        classes = np.asarray(classes).reshape(-1)
         
-    def _apply_nms(self, detections: List[Dict]) -> List[Dict]:
-        """Apply Non-Maximum Suppression"""
-        if not detections:
-            return []
+        # Filter by confidence before doing any further work; padded slots score 0
+        keep = scores > self.confidence_threshold
+        if not keep.any():
+            return Detections.empty()
             
-        # Extract bounding boxes and scores
-        boxes = np.array([d['bbox'] for d in detections])
-        scores = np.array([d['confidence'] for d in detections])
+        height, width = image_shape[:2]
+        
+        # Normalized [ymin, xmin, ymax, xmax] -> pixel top-left boxes (x, y, w, h)
+        ymin, xmin, ymax, xmax = (boxes[keep] * np.array(
+            [height, width, height, width], dtype=np.float32
+        )).T
+        pixel_boxes = np.stack(
+            [xmin, ymin, xmax - xmin, ymax - ymin],
+            axis=1
+        ).astype(np.int32)
         
-        # Apply NMS
+        # Class ids stay 1-based as in the label map
+        return self._apply_nms(Detections(
+            boxes=pixel_boxes,
+            scores=scores[keep],
+            class_ids=classes[keep].astype(np.int32),
+            class_names=None
+        ))
+        
+    def _apply_nms(self, detections: Detections) -> Detections:
+        """Apply Non-Maximum Suppression"""
+        if not len(detections):
+            return detections
+            
         indices = cv2.dnn.NMSBoxes(
-            boxes.tolist(),
-            scores.tolist(),
+            detections.boxes.tolist(),
+            detections.scores.tolist(),
             self.confidence_threshold,
             self.nms_threshold
         )
         
-        return [detections[i] for i in indices]
+        return detections[np.asarray(indices, dtype=np.int64).reshape(-1)]
         
-    def detect(self, image: np.ndarray) -> List[Dict]:
-        """Perform detection on an image"""
-        # Preprocess
-        blob = self.preprocess_image(image)
+    def detect(
+        self,
+        image: np.ndarray,
+        image_shape: Optional[Tuple[int, int]] = None
+    ) -> Detections:
+        """Perform detection on an image, scaling boxes to image_shape if given"""
+        # Run detection
+        (boxes, scores, classes) = self.session.run(
+            [self.boxes_t, self.scores_t, self.classes_t],
+            feed_dict={self.image_tensor: np.expand_dims(image, axis=0)}
+        )
         
-        with self.model.as_default():
-            with tf.Session(graph=self.model) as sess:
-                # Get tensors
-                image_tensor = self.model.get_tensor_by_name('image_tensor:0')
-                boxes = self.model.get_tensor_by_name('detection_boxes:0')
-                scores = self.model.get_tensor_by_name('detection_scores:0')
-                classes = self.model.get_tensor_by_name('detection_classes:0')
-                
-                # Run detection
-                (boxes, scores, classes) = sess.run(
-                    [boxes, scores, classes],
-                    feed_dict={image_tensor: np.expand_dims(image, axis=0)}
-                )
-                
-                # Process detections
-                detections = self.postprocess_detections(
-                    boxes[0],
-                    image.shape[:2]
-                )
-                
-                return detections
+        # Process detections
+        detections = self.postprocess_detections(
+            boxes[0],
+            scores[0],
+            classes[0],
+            image_shape or image.shape[:2]
+        )
+        
+        return detections
+        
+    def close(self):
+        """Release the TensorFlow session"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
 
 class DetectionModel:
     """High-level model interface"""
@@ -117,26 +196,25 @@ class DetectionModel:
         self.helmet_model = YOLOModel(config)
         self.classes = config['CLASSES']
         
-    def process_frame(self, frame: np.ndarray) -> Tuple[List[Dict], np.ndarray]:
-        """Process a single frame"""
-        # Make copy of frame
-        processed_frame = frame.copy()
+        # Dense id -> name lookup so classification is a plain list index
+        self.class_names = [None] * (max(self.classes) + 1)
+        for class_id, class_name in self.classes.items():
+            self.class_names[class_id] = class_name
+        self._class_name_lut = np.array(self.class_names, dtype=object)
         
-        # Perform detection
-        detections = self.helmet_model.detect(processed_frame)
+    def process_frame(self, frame: np.ndarray) -> Tuple[Detections, np.ndarray]:
+        """Process a single frame"""
+        # Detection does not mutate the frame, so no copy is needed here;
+        # callers that draw on the result copy it only when they annotate
+        detections = self.helmet_model.detect(frame)
         
         # Classify detections
         classified_detections = self._classify_detections(detections)
         
-        return classified_detections, processed_frame
+        return classified_detections, frame
         
-    def _classify_detections(self, detections: List[Dict]) -> List[Dict]:
+    def _classify_detections(self, detections: Detections) -> Detections:
         """Classify detections into specific categories"""
-        classified = []
-        
-        for detection in detections:
-            class_name = self.classes[detection['class_id']]
-            detection['class_name'] = class_name
-            classified.append(detection)
-            
-        return classified
\ No newline at end of file
+        # One gather over all class ids
+        detections.class_names = self._class_name_lut[detections.class_ids]
+        return detections
\ No newline at end of file
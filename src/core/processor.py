@@ -5,8 +5,71 @@ from pathlib import Path
 from abc import ABC, abstractmethod
 import logging
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+if NUMBA_AVAILABLE:
+    # Compiled eagerly with an explicit signature so the first frame pays no JIT cost
+    @njit('void(uint8[:, :, ::1], float32[:, :, ::1])', parallel=True, fastmath=True, cache=True)
+    def _preprocess_fused(src, dst):
+        """Bilinear resize, 1/255 scaling and BGR->RGB in a single pass"""
+        src_h, src_w = src.shape[0], src.shape[1]
+        dst_h, dst_w = dst.shape[0], dst.shape[1]
+        scale_y = src_h / dst_h
+        scale_x = src_w / dst_w
+        inv_255 = np.float32(1.0 / 255.0)
+        
+        for y in prange(dst_h):
+            # Source row and vertical weight computed once per output row
+            sy = max((y + 0.5) * scale_y - 0.5, 0.0)
+            y0 = min(int(sy), src_h - 1)
+            y1 = min(y0 + 1, src_h - 1)
+            wy = sy - y0
+            
+            for x in range(dst_w):
+                sx = max((x + 0.5) * scale_x - 0.5, 0.0)
+                x0 = min(int(sx), src_w - 1)
+                x1 = min(x0 + 1, src_w - 1)
+                wx = sx - x0
+                
+                w00 = (1.0 - wy) * (1.0 - wx)
+                w01 = (1.0 - wy) * wx
+                w10 = wy * (1.0 - wx)
+                w11 = wy * wx
+                
+                for c in range(3):
+                    value = (src[y0, x0, c] * w00 + src[y0, x1, c] * w01 +
+                             src[y1, x0, c] * w10 + src[y1, x1, c] * w11)
+                    # Writing to 2 - c performs the BGR->RGB swap
+                    dst[y, x, 2 - c] = value * inv_255
+
+    @njit('void(float32[:, :, ::1], float32[:, :, ::1], float32, float32, boolean, boolean, float32)',
+          parallel=True, fastmath=True, cache=True)
+    def _augment_fused(src, dst, delta, factor, do_brightness, do_contrast, upper):
+        """Brightness shift and contrast scaling with clipping in a single pass"""
+        height, width, channels = src.shape
+        for y in prange(height):
+            for x in range(width):
+                for c in range(channels):
+                    v = src[y, x, c]
+                    if do_brightness:
+                        v = min(upper, max(np.float32(0.0), v + delta))
+                    if do_contrast:
+                        v = min(upper, max(np.float32(0.0), v * factor))
+                    dst[y, x, c] = v
+
+def _cuda_available() -> bool:
+    """Check whether OpenCV was built with CUDA and a device is present"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
 class BaseProcessor(ABC):
     """Abstract base class for all processors"""
     
@@ -15,6 +78,20 @@ class BaseProcessor(ABC):
         self.target_size = config.get('IMAGE_SIZE', (416, 416))
         self.normalize = config.get('NORMALIZE', True)
         self.swap_rgb = config.get('SWAP_RGB', True)
+        self.channels_first = config.get('CHANNELS_FIRST', False)
+        
+        # float16 halves the bytes sent to FP16 engines; only applies to normalized output
+        if self.normalize:
+            self.output_dtype = np.dtype(config.get('OUTPUT_DTYPE', np.float32))
+        else:
+            self.output_dtype = np.dtype(np.uint8)
+        
+        # The fused kernel covers exactly resize + normalize + RGB swap into HWC
+        self.fused = (
+            NUMBA_AVAILABLE and self.normalize and self.swap_rgb
+            and not self.channels_first
+            and config.get('FUSED_PREPROCESS', True)
+        )
 
     @abstractmethod
     def process(self, input_data: np.ndarray) -> np.ndarray:
@@ -24,18 +101,26 @@ class BaseProcessor(ABC):
     def preprocess(self, image: np.ndarray) -> np.ndarray:
         """Common preprocessing steps"""
         try:
-            # Resize image
-            processed = cv2.resize(image, self.target_size)
-            
-            # Normalize if required
-            if self.normalize:
-                processed = processed.astype(np.float32) / 255.0
-                
-            # Swap RGB if required
-            if self.swap_rgb:
-                processed = cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
+            if self.fused and image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] == 3:
+                width, height = self.target_size
+                processed = np.empty((height, width, 3), dtype=np.float32)
+                _preprocess_fused(np.ascontiguousarray(image), processed)
+                return processed.astype(self.output_dtype, copy=False)
                 
-            return processed
+            # Resize, scale and swap RGB in one call, producing a CHW blob
+            blob = cv2.dnn.blobFromImage(
+                image,
+                scalefactor=1.0 / 255.0 if self.normalize else 1.0,
+                size=self.target_size,
+                swapRB=self.swap_rgb,
+                crop=False,
+                ddepth=cv2.CV_32F if self.normalize else cv2.CV_8U
+            )[0]
+            
+            if self.channels_first:
+                return blob.astype(self.output_dtype, copy=False)
+            # The HWC copy and the dtype cast share a single pass
+            return blob.transpose(1, 2, 0).astype(self.output_dtype, order='C')
         except Exception as e:
             logger.error(f"Error in preprocessing: {e}")
             raise
@@ -46,6 +131,7 @@ class ImageProcessor(BaseProcessor):
     def __init__(self, config: Dict):
         super().__init__(config)
         self.augmentation = config.get('AUGMENTATION', False)
+        self._rng = np.random.default_rng(config.get('SEED'))
 
     def process(self, image: np.ndarray) -> np.ndarray:
         """Process a single image"""
@@ -65,17 +151,35 @@ class ImageProcessor(BaseProcessor):
     def apply_augmentation(self, image: np.ndarray) -> np.ndarray:
         """Apply augmentation techniques"""
         try:
+            # Normalized images live in [0, 1], so shift and clip on that scale
+            upper = 1.0 if self.normalize else 255.0
+            
             # Random brightness adjustment
-            if np.random.rand() > 0.5:
-                delta = 30
-                image = image + np.random.uniform(-delta, delta)
-                image = np.clip(image, 0, 255)
-                
+            do_brightness = self._rng.random() > 0.5
+            delta = self._rng.uniform(-30, 30) * upper / 255.0 if do_brightness else 0.0
+            
             # Random contrast adjustment
-            if np.random.rand() > 0.5:
-                factor = np.random.uniform(0.5, 1.5)
-                image = image * factor
-                image = np.clip(image, 0, 255)
+            do_contrast = self._rng.random() > 0.5
+            factor = self._rng.uniform(0.5, 1.5) if do_contrast else 1.0
+            
+            if NUMBA_AVAILABLE and image.dtype == np.float32 and image.ndim == 3:
+                src = np.ascontiguousarray(image)
+                augmented = np.empty_like(src)
+                _augment_fused(src, augmented, delta, factor, do_brightness, do_contrast, upper)
+                return augmented
+                
+            # Work in place, copying only when the input cannot hold the result
+            if not np.issubdtype(image.dtype, np.floating):
+                image = image.astype(np.float32)
+            elif not image.flags.writeable:
+                image = image.copy()
+                
+            if do_brightness:
+                np.add(image, delta, out=image)
+                np.clip(image, 0, upper, out=image)
+            if do_contrast:
+                np.multiply(image, factor, out=image)
+                np.clip(image, 0, upper, out=image)
                 
             return image
         except Exception as e:
@@ -88,16 +192,22 @@ class VideoProcessor(BaseProcessor):
     def __init__(self, config: Dict):
         super().__init__(config)
         self.frame_skip = config.get('FRAME_SKIP', 0)
+        self._skip_mod = self.frame_skip + 1
         self.buffer_size = config.get('BUFFER_SIZE', 10)
-        self.frame_buffer = []
         self.frame_count = 0
+        
+        # Ring buffer and running sum, allocated on the first frame
+        self._ring = None
+        self._sum = None
+        self._index = 0
+        self._count = 0
 
     def process(self, frame: np.ndarray) -> Optional[np.ndarray]:
         """Process a video frame"""
         try:
-            # Frame skipping
-            self.frame_count += 1
-            if self.frame_skip and self.frame_count % (self.frame_skip + 1) != 0:
+            # Frame skipping, counting modulo the skip period so it never grows
+            self.frame_count = (self.frame_count + 1) % self._skip_mod
+            if self.frame_count:
                 return None
                 
             # Basic preprocessing
@@ -111,32 +221,91 @@ class VideoProcessor(BaseProcessor):
             logger.error(f"Error processing video frame: {e}")
             raise
 
+    def _allocate_buffer(self, frame: np.ndarray):
+        """Allocate the ring buffer and running sum for the frame layout"""
+        sum_dtype = np.uint32 if frame.dtype == np.uint8 else np.float64
+        self._ring = np.empty((self.buffer_size,) + frame.shape, dtype=frame.dtype)
+        self._sum = np.zeros(frame.shape, dtype=sum_dtype)
+        self._index = 0
+        self._count = 0
+
     def update_buffer(self, frame: np.ndarray):
         """Update frame buffer"""
-        self.frame_buffer.append(frame)
-        if len(self.frame_buffer) > self.buffer_size:
-            self.frame_buffer.pop(0)
+        if (self._ring is None or self._ring.shape[1:] != frame.shape
+                or self._ring.dtype != frame.dtype):
+            self._allocate_buffer(frame)
+            
+        slot = self._ring[self._index]
+        if self._count == self.buffer_size:
+            # Evict the oldest frame from the running sum
+            np.subtract(self._sum, slot, out=self._sum, casting='unsafe')
+        else:
+            self._count += 1
+            
+        slot[...] = frame
+        np.add(self._sum, slot, out=self._sum, casting='unsafe')
+        self._index = (self._index + 1) % self.buffer_size
 
     def get_buffer_average(self) -> np.ndarray:
         """Calculate average frame from buffer"""
-        if not self.frame_buffer:
+        if not self._count:
             return None
-        return np.mean(self.frame_buffer, axis=0).astype(np.uint8)
+        if self._sum.dtype == np.uint32:
+            return (self._sum // self._count).astype(np.uint8)
+        return (self._sum / self._count).astype(np.uint8)
 
 class FrameProcessor:
     """High-level processor combining multiple processing steps"""
     
+    DENOISE_MODES = ('nlm_gpu', 'bilateral', 'nlm_cpu', 'off')
+    
     def __init__(self, config: Dict):
         self.image_processor = ImageProcessor(config)
         self.video_processor = VideoProcessor(config)
+        self.denoise_mode = self._resolve_denoise_mode(config)
+        self._denoise = self._setup_denoiser(self.denoise_mode)
+        
+        # Run the enhancement chain through the T-API when OpenCL is available
+        self._use_umat = cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(self._use_umat)
+        self._clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
         self.processing_pipeline = self.setup_pipeline(config)
+        
+    def _resolve_denoise_mode(self, config: Dict) -> str:
+        """Pick the denoising backend from config and available hardware"""
+        if not config.get('ENABLE_DENOISING', True):
+            return 'off'
+            
+        mode = config.get('DENOISE_MODE', 'auto')
+        if mode == 'auto':
+            mode = 'nlm_gpu' if _cuda_available() else 'bilateral'
+        elif mode == 'nlm_gpu' and not _cuda_available():
+            logger.warning("DENOISE_MODE 'nlm_gpu' requested without CUDA, using 'bilateral'")
+            mode = 'bilateral'
+            
+        if mode not in self.DENOISE_MODES:
+            raise ValueError(f"Invalid DENOISE_MODE: {mode}")
+        return mode
+        
+    def _setup_denoiser(self, mode: str):
+        """Create the denoise callable, keeping GPU buffers alive across frames"""
+        if mode == 'nlm_gpu':
+            self._gpu_src = cv2.cuda_GpuMat()
+            self._gpu_dst = cv2.cuda_GpuMat()
+            self._stream = cv2.cuda.Stream()
+            return self._denoise_nlm_gpu
+        if mode == 'bilateral':
+            return lambda frame: cv2.bilateralFilter(frame, d=5, sigmaColor=50, sigmaSpace=50)
+        if mode == 'nlm_cpu':
+            return lambda frame: cv2.fastNlMeansDenoisingColored(frame, None, 10, 10, 7, 21)
+        return None
 
     def setup_pipeline(self, config: Dict) -> List:
         """Setup processing pipeline based on configuration"""
         pipeline = []
         
         # Add processing steps based on config
-        if config.get('ENABLE_DENOISING', True):
+        if self.denoise_mode != 'off':
             pipeline.append(self.denoise_frame)
         if config.get('ENABLE_ENHANCEMENT', True):
             pipeline.append(self.enhance_frame)
@@ -163,21 +332,37 @@ class FrameProcessor:
             logger.error(f"Error in frame processing pipeline: {e}")
             raise
 
-    @staticmethod
-    def denoise_frame(frame: np.ndarray) -> np.ndarray:
+    def denoise_frame(self, frame: np.ndarray) -> np.ndarray:
         """Apply denoising to frame"""
-        return cv2.fastNlMeansDenoisingColored(frame, None, 10, 10, 7, 21)
+        if self._denoise is None:
+            return frame
+        return self._denoise(frame)
+        
+    def _denoise_nlm_gpu(self, frame: np.ndarray) -> np.ndarray:
+        """Non-local means denoising on the GPU with persistent buffers"""
+        self._gpu_src.upload(frame, self._stream)
+        self._gpu_dst = cv2.cuda.fastNlMeansDenoisingColored(
+            self._gpu_src, 10, 10,
+            dst=self._gpu_dst,
+            search_window=21,
+            block_size=7,
+            stream=self._stream
+        )
+        # Download straight into a fresh array the caller owns
+        denoised = self._gpu_dst.download(self._stream)
+        self._stream.waitForCompletion()
+        return denoised
 
-    @staticmethod
-    def enhance_frame(frame: np.ndarray) -> np.ndarray:
+    def enhance_frame(self, frame: np.ndarray) -> np.ndarray:
         """Enhance frame quality"""
+        src = cv2.UMat(frame) if self._use_umat else frame
+        
         # Convert to LAB color space
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        lab = cv2.cvtColor(src, cv2.COLOR_BGR2LAB)
         l, a, b = cv2.split(lab)
         
         # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        cl = clahe.apply(l)
+        cl = self._clahe.apply(l)
         
         # Merge channels
         enhanced_lab = cv2.merge((cl,a,b))
@@ -185,4 +370,4 @@ class FrameProcessor:
         # Convert back to BGR
         enhanced_bgr = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
         
-        return enhanced_bgr
\ No newline at end of file
+        return enhanced_bgr.get() if self._use_umat else enhanced_bgr
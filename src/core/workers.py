@@ -0,0 +1,149 @@
+"""
+Multi-process inference workers for CPU deployments.
+Each worker owns its own YOLOModel session pinned to a disjoint set of cores.
+"""
+
+import os
+import time
+import queue
+import logging
+import multiprocessing as mp
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .model import YOLOModel
+
+logger = logging.getLogger(__name__)
+
+def split_cores(num_workers: int, cores: Optional[Sequence[int]] = None) -> List[List[int]]:
+    """Split the available cores into contiguous, disjoint groups"""
+    if cores is None:
+        cores = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else range(os.cpu_count() or 1)
+    cores = sorted(cores)
+    num_workers = max(1, min(num_workers, len(cores)))
+    
+    # Contiguous ids usually share a socket/NUMA node
+    per_worker, remainder = divmod(len(cores), num_workers)
+    groups = []
+    start = 0
+    for i in range(num_workers):
+        end = start + per_worker + (1 if i < remainder else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+def _worker_main(worker_id: int, config: Dict, cores: List[int],
+                 in_queue: mp.Queue, out_queue: mp.Queue):
+    """Worker process entry point"""
+    try:
+        os.sched_setaffinity(0, cores)
+    except (AttributeError, OSError) as e:
+        logger.warning(f"Worker {worker_id} could not pin to cores {cores}: {e}")
+    
+    # One intra-op thread per pinned core, small inter-op pool
+    worker_config = dict(config)
+    worker_config['INTRA_OP_THREADS'] = len(cores)
+    worker_config['INTER_OP_THREADS'] = 2
+    try:
+        model = YOLOModel(worker_config)
+    except Exception as e:
+        # Report instead of exiting silently so the parent does not wait forever
+        logger.error(f"Worker {worker_id} failed to load the model: {e}")
+        out_queue.put((None, None, f"Worker {worker_id} failed to load the model: {e}"))
+        return
+    
+    try:
+        while True:
+            task = in_queue.get()
+            if task is None:
+                break
+            
+            batch_id, frames = task
+            try:
+                out_queue.put((batch_id, [model.detect(frame) for frame in frames], None))
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed on batch {batch_id}: {e}")
+                out_queue.put((batch_id, None, str(e)))
+    finally:
+        model.close()
+
+class WorkerPool:
+    """Pool of core-pinned inference processes fed from a shared queue"""
+    
+    def __init__(self, config: Dict, num_workers: Optional[int] = None,
+                 cores: Optional[Sequence[int]] = None):
+        self.config = config
+        self.core_groups = split_cores(num_workers or os.cpu_count() or 1, cores)
+        self._ctx = mp.get_context('spawn')
+        self.in_queue = self._ctx.Queue()
+        self.out_queue = self._ctx.Queue()
+        self.workers: List[mp.Process] = []
+    
+    def start(self):
+        """Spawn one worker per core group"""
+        for worker_id, cores in enumerate(self.core_groups):
+            worker = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.config, cores, self.in_queue, self.out_queue)
+            )
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+        logger.info(f"Started {len(self.workers)} inference workers")
+    
+    def submit(self, batch_id: Any, frames: List[np.ndarray]):
+        """Queue a batch of frames for detection"""
+        self.in_queue.put((batch_id, frames))
+    
+    def get_result(self, timeout: Optional[float] = None) -> Tuple[Any, List]:
+        """Get the next finished batch as (batch_id, detections)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Wake up periodically to notice workers that died without reporting
+            wait = 1.0 if deadline is None else max(0.0, min(1.0, deadline - time.monotonic()))
+            try:
+                batch_id, results, error = self.out_queue.get(timeout=wait)
+                break
+            except queue.Empty:
+                dead = [worker.pid for worker in self.workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Inference workers exited unexpectedly: {dead}")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+                    
+        if error is not None:
+            if batch_id is None:
+                raise RuntimeError(error)
+            raise RuntimeError(f"Inference failed for batch {batch_id}: {error}")
+        return batch_id, results
+    
+    def map_batches(self, batches: Iterable[List[np.ndarray]]) -> List[List]:
+        """Run detection over batches and return results in input order"""
+        batches = list(batches)
+        
+        # Largest batches first so workers finish at roughly the same time
+        order = sorted(range(len(batches)), key=lambda i: len(batches[i]), reverse=True)
+        for i in order:
+            self.submit(i, batches[i])
+        
+        results = [None] * len(batches)
+        for _ in batches:
+            batch_id, detections = self.get_result()
+            results[batch_id] = detections
+        return results
+    
+    def close(self):
+        """Stop all workers"""
+        for _ in self.workers:
+            self.in_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+    
+    def __enter__(self) -> 'WorkerPool':
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,102 +1,418 @@
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from queue import Queue
+
+import numpy as np
+
+# Prepared statements kept alive per connection; covers every statement below with headroom
+_STATEMENT_CACHE_SIZE = 256
+
+# Statement text is kept constant so every call hits the connection's statement cache
+_SQL_CREATE_OWNERS = '''
+    CREATE TABLE IF NOT EXISTS vehicle_owners (
+        license_plate TEXT PRIMARY KEY,
+        owner_name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        address TEXT
+    )
+'''
+
+_SQL_CREATE_VIOLATIONS = '''
+    CREATE TABLE IF NOT EXISTS violations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        license_plate TEXT,
+        violation_type TEXT,
+        fine_amount REAL,
+        date_time TIMESTAMP,
+        image_path TEXT,
+        location TEXT,
+        processed INTEGER DEFAULT 0,
+        payment_status TEXT DEFAULT 'pending',
+        FOREIGN KEY (license_plate) REFERENCES vehicle_owners(license_plate)
+    )
+'''
+
+# Same layout as models/yolo/data/database/schema/init.sql
+_SQL_CREATE_PAYMENTS = '''
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        violation_id INTEGER,
+        amount REAL NOT NULL,
+        payment_method TEXT NOT NULL,
+        transaction_id TEXT,
+        status TEXT DEFAULT 'pending',
+        payment_date TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (violation_id) REFERENCES violations(id)
+    )
+'''
+
+# Columns added to violations after its first release; older databases get them
+# through ALTER TABLE since CREATE TABLE IF NOT EXISTS leaves existing tables alone
+_VIOLATION_COLUMN_MIGRATIONS = (
+    ('date_time', 'TIMESTAMP'),
+    ('location', 'TEXT'),
+    ('payment_status', "TEXT DEFAULT 'pending'")
+)
+
+_SQL_CREATE_INDEXES = (
+    '''
+    CREATE INDEX IF NOT EXISTS idx_viol_pending
+    ON violations(processed, license_plate, violation_type, fine_amount)
+    ''',
+    # Covers both statistics aggregates without touching the table rows
+    '''
+    CREATE INDEX IF NOT EXISTS idx_viol_type
+    ON violations(violation_type, fine_amount)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_v_datetime
+    ON violations(date_time)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_payments_violation_id
+    ON payments(violation_id)
+    '''
+)
+
+_SQL_UPSERT_OWNER = '''
+    INSERT OR REPLACE INTO vehicle_owners
+    (license_plate, owner_name, email, phone, address)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+_SQL_GET_OWNER = '''
+    SELECT * FROM vehicle_owners
+    WHERE license_plate = ?
+'''
+
+_SQL_INSERT_VIOLATION = '''
+    INSERT INTO violations
+    (license_plate, violation_type, fine_amount, date_time, image_path, location)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_GET_VIOLATION = '''
+    SELECT id, license_plate, violation_type, fine_amount, date_time,
+           image_path, location, processed, payment_status
+    FROM violations
+    WHERE id = ?
+'''
+
+_SQL_GET_PENDING_VIOLATIONS = '''
+    SELECT v.id, v.license_plate, v.violation_type, v.fine_amount,
+           v.date_time, v.image_path, v.location,
+           o.owner_name, o.email
+    FROM violations v
+    LEFT JOIN vehicle_owners o ON v.license_plate = o.license_plate
+    WHERE v.processed = 0
+    ORDER BY v.id
+'''
+
+# Fixed-width record layout for callers that aggregate pending violations with NumPy
+VIOL_DTYPE = np.dtype([
+    ('id', 'i8'),
+    ('license_plate', 'U16'),
+    ('type', 'U24'),
+    ('fine', 'f4'),
+    ('processed', '?'),
+    ('payment_status', 'U8')
+])
+
+_SQL_GET_PENDING_VIOLATIONS_ARRAY = '''
+    SELECT id, COALESCE(license_plate, ''), COALESCE(violation_type, ''),
+           COALESCE(fine_amount, 0), processed, payment_status
+    FROM violations
+    WHERE processed = 0
+    ORDER BY id
+'''
+
+# Totals row (per_type = 0) followed by one row per violation type, in one round-trip
+_SQL_VIOLATION_STATISTICS = '''
+    SELECT 0 AS per_type, NULL AS violation_type,
+           COUNT(*) AS count, COALESCE(SUM(fine_amount), 0) AS total_fines
+    FROM violations
+    UNION ALL
+    SELECT 1, violation_type, COUNT(*), NULL
+    FROM violations
+    GROUP BY violation_type
+'''
+
+_SQL_INSERT_PAYMENT = '''
+    INSERT INTO payments
+    (violation_id, amount, payment_method, transaction_id, status, payment_date)
+    VALUES (?, ?, ?, ?, 'completed', ?)
+'''
+
+_SQL_MARK_PAID = '''
+    UPDATE violations
+    SET payment_status = 'paid'
+    WHERE id = ?
+'''
+
+_SQL_GET_VIOLATIONS = '''
+    SELECT v.id, v.license_plate, v.violation_type, v.fine_amount,
+           v.date_time, v.image_path, v.processed,
+           o.owner_name, o.email
+    FROM violations v
+    JOIN vehicle_owners o ON v.license_plate = o.license_plate
+    WHERE v.processed = ?
+'''
+
+_SQL_MARK_PROCESSED = '''
+    UPDATE violations
+    SET processed = 1
+    WHERE id = ?
+'''
 
 class DatabaseManager:
-    def __init__(self, db_path):
-        self.db_path = Path(db_path)
+    def __init__(self, config, template=None):
+        # Accept the full app config, its 'database' section, or a bare path
+        if isinstance(config, dict):
+            db_config = config.get('database', config)
+        else:
+            db_config = {'DB_PATH': config}
+        
+        self.db_path = str(db_config['DB_PATH'])
+        self.in_memory = self.db_path == ':memory:'
+        self.pool_size = db_config.get('POOL_SIZE', 5)
+        self.busy_timeout_ms = int(db_config.get('TIMEOUT', 5) * 1000)
+        self.foreign_keys = db_config.get('ENABLE_FOREIGN_KEYS', False)
+        
+        # One writer reused under the write lock, plus a pool of read-only connections
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._readers = Queue(maxsize=self.pool_size)
+        self._reader_conns = []
+        
+        # An already initialised manager whose schema is copied instead of re-running DDL
+        self._template = template
         self.setup_database()
+    
+    def _configure(self, conn, readonly=False):
+        # Applied to every connection so they all share the same tuning
+        if not self.in_memory and not readonly:
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute(f'PRAGMA busy_timeout={self.busy_timeout_ms}')
+        conn.execute(f'PRAGMA foreign_keys={"ON" if self.foreign_keys else "OFF"}')
+    
+    def _connect(self, readonly=False):
+        # Autocommit connections shared across threads; callers serialize access
+        if readonly:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, isolation_level=None, check_same_thread=False,
+                cached_statements=_STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path, isolation_level=None, check_same_thread=False,
+                cached_statements=_STATEMENT_CACHE_SIZE
+            )
+        conn.row_factory = sqlite3.Row
+        self._configure(conn, readonly)
+        return conn
+    
+    def _open_readers(self):
+        # A private :memory: database is only visible to the writer, so reads go through it
+        if self.in_memory or self._reader_conns:
+            return
+        for _ in range(self.pool_size):
+            conn = self._connect(readonly=True)
+            self._reader_conns.append(conn)
+            self._readers.put(conn)
+    
+    @contextmanager
+    def _reader(self):
+        if not self._reader_conns:
+            with self._write_lock:
+                yield self._writer
+            return
         
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
     def setup_database(self):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create tables
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS vehicle_owners (
-                    license_plate TEXT PRIMARY KEY,
-                    owner_name TEXT NOT NULL,
-                    email TEXT,
-                    phone TEXT,
-                    address TEXT
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS violations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    license_plate TEXT,
-                    violation_type TEXT,
-                    fine_amount REAL,
-                    date_time TIMESTAMP,
-                    image_path TEXT,
-                    processed BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (license_plate) REFERENCES vehicle_owners(license_plate)
-                )
-            ''')
-            
-            conn.commit()
-            
+        if self._writer is None:
+            self._writer = self._connect()
+            if self._template is not None:
+                self._clone_from(self._template)
+                self._open_readers()
+                return
+        conn = self._writer
+        
+        # Create tables
+        conn.execute(_SQL_CREATE_OWNERS)
+        conn.execute(_SQL_CREATE_VIOLATIONS)
+        conn.execute(_SQL_CREATE_PAYMENTS)
+        self._migrate(conn)
+        
+        # Create indexes
+        for statement in _SQL_CREATE_INDEXES:
+            conn.execute(statement)
+        
+        # Seed planner statistics so the indexes are chosen from the first query
+        conn.execute('ANALYZE')
+        
+        self._open_readers()
+    
+    def _migrate(self, conn):
+        # Bring violations tables created by earlier versions up to the current columns
+        existing = {row['name'] for row in conn.execute('PRAGMA table_info(violations)')}
+        for column, definition in _VIOLATION_COLUMN_MIGRATIONS:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE violations ADD COLUMN {column} {definition}')
+    
+    def _clone_from(self, template):
+        # Page-level copy of the template database through the backup API
+        with template._write_lock:
+            template._writer.backup(self._writer)
+    
     def add_vehicle_owner(self, owner_data):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO vehicle_owners
-                (license_plate, owner_name, email, phone, address)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
+        with self._write_lock:
+            conn = self._writer
+            conn.execute(_SQL_UPSERT_OWNER, (
                 owner_data['license_plate'],
                 owner_data['owner_name'],
                 owner_data['email'],
                 owner_data['phone'],
                 owner_data['address']
             ))
-            conn.commit()
-            
+        return True
+    
     def get_owner_details(self, license_plate):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM vehicle_owners
-                WHERE license_plate = ?
-            ''', (license_plate,))
-            return cursor.fetchone()
-            
+        with self._reader() as conn:
+            return conn.execute(_SQL_GET_OWNER, (license_plate,)).fetchone()
+    
+    def get_vehicle_owner(self, license_plate):
+        row = self.get_owner_details(license_plate)
+        return dict(row) if row is not None else None
+    
     def record_violation(self, violation_data):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO violations
-                (license_plate, violation_type, fine_amount, date_time, image_path)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
+        with self._write_lock:
+            conn = self._writer
+            cursor = conn.execute(_SQL_INSERT_VIOLATION, (
                 violation_data['license_plate'],
                 violation_data['violation_type'],
                 violation_data['fine_amount'],
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                violation_data['image_path']
+                violation_data['image_path'],
+                violation_data.get('location')
             ))
-            violation_id = cursor.lastrowid
-            conn.commit()
-            return violation_id
+            return cursor.lastrowid
+    
+    def record_violations(self, violations):
+        # Single transaction so a batch costs one commit instead of one per row
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = (
+            (
+                violation_data['license_plate'],
+                violation_data['violation_type'],
+                violation_data['fine_amount'],
+                timestamp,
+                violation_data['image_path'],
+                violation_data.get('location')
+            )
+            for violation_data in violations
+        )
+        
+        with self._write_lock:
+            conn = self._writer
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                count = conn.executemany(_SQL_INSERT_VIOLATION, rows).rowcount
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
             
+            # The writer is exclusive, so the batch received consecutive ids
+            return list(range(last_id - count + 1, last_id + 1)) if count > 0 else []
+    
+    def get_violation(self, violation_id):
+        with self._reader() as conn:
+            row = conn.execute(_SQL_GET_VIOLATION, (violation_id,)).fetchone()
+        if row is None:
+            return None
+        violation = dict(row)
+        violation['processed'] = bool(violation['processed'])
+        return violation
+    
     def get_violations(self, processed=False):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
+            return conn.execute(_SQL_GET_VIOLATIONS, (int(processed),)).fetchall()
+    
+    def get_pending_violations(self):
+        with self._reader() as conn:
+            return [dict(row) for row in conn.execute(_SQL_GET_PENDING_VIOLATIONS)]
+    
+    def get_pending_violations_array(self):
+        # Plain tuples feed np.array directly, skipping the per-row dicts
+        with self._reader() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT v.*, o.owner_name, o.email
-                FROM violations v
-                JOIN vehicle_owners o ON v.license_plate = o.license_plate
-                WHERE v.processed = ?
-            ''', (processed,))
-            return cursor.fetchall()
-            
+            cursor.row_factory = None
+            rows = cursor.execute(_SQL_GET_PENDING_VIOLATIONS_ARRAY).fetchall()
+        return np.array(rows, dtype=VIOL_DTYPE)
+    
+    def get_violation_statistics(self):
+        stats = {'total_violations': 0, 'total_fines': 0, 'violations_by_type': {}}
+        with self._reader() as conn:
+            for row in conn.execute(_SQL_VIOLATION_STATISTICS):
+                if row['per_type']:
+                    stats['violations_by_type'][row['violation_type']] = row['count']
+                else:
+                    stats['total_violations'] = row['count']
+                    stats['total_fines'] = row['total_fines']
+        return stats
+    
     def mark_violation_processed(self, violation_id):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE violations
-                SET processed = TRUE
-                WHERE id = ?
-            ''', (violation_id,))
-            conn.commit()
\ No newline at end of file
+        with self._write_lock:
+            conn = self._writer
+            cursor = conn.execute(_SQL_MARK_PROCESSED, (violation_id,))
+            return cursor.rowcount > 0
+    
+    def record_payment(self, payment_data):
+        # Payment row and status update commit together
+        with self._write_lock:
+            conn = self._writer
+            conn.execute('BEGIN')
+            try:
+                cursor = conn.execute(_SQL_MARK_PAID, (payment_data['violation_id'],))
+                if cursor.rowcount == 0:
+                    conn.execute('ROLLBACK')
+                    return False
+                conn.execute(_SQL_INSERT_PAYMENT, (
+                    payment_data['violation_id'],
+                    payment_data['amount'],
+                    payment_data['payment_method'],
+                    payment_data['transaction_id'],
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                ))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            return True
+    
+    def close(self):
+        for conn in self._reader_conns:
+            conn.close()
+        self._reader_conns = []
+        self._readers = Queue(maxsize=self.pool_size)
+        
+        if self._writer is not None:
+            # Refresh statistics that went stale; readers are read-only so this runs here
+            self._writer.execute('PRAGMA optimize')
+            self._writer.close()
+            self._writer = None
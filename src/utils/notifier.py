@@ -12,8 +12,10 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 import time
+import heapq
+import itertools
 import threading
-from queue import Queue
+from queue import Queue, Empty
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +62,17 @@ class NotificationManager:
         self.notification_queue = Queue()
         self.retry_delays = [5, 15, 30]  # Retry delays in seconds
         self.templates = EmailTemplate()
+        self.batch_size = config.get('notification', {}).get('batch_size', 10)
+        self.keepalive_interval = 30  # Seconds of idle time before a NOOP
+        
+        # Long-lived SMTP connection owned by the worker thread
+        self._smtp = None
+        self._last_activity = time.monotonic()
+        
+        # Failed sends wait here as (due_time, seq, notification) instead of blocking the worker
+        self._retry_heap = []
+        self._retry_lock = threading.Lock()
+        self._retry_seq = itertools.count()
         
         # Start notification worker thread
         self.worker_thread = threading.Thread(target=self._process_notification_queue)
@@ -71,26 +84,24 @@ class NotificationManager:
                             image_path: Optional[str] = None) -> bool:
         """Send violation notice email"""
         try:
-            # Prepare email
-            msg = MIMEMultipart()
-            msg['From'] = self.email_config['SENDER_EMAIL']
-            msg['To'] = violation_data['owner_email']
-            msg['Subject'] = f"Traffic Violation Notice - {violation_data['license_plate']}"
-            
-            # Add email body
+            # Prepare email; attachments are read only when the message is sent
+            headers = {
+                'From': self.email_config['SENDER_EMAIL'],
+                'To': violation_data['owner_email'],
+                'Subject': f"Traffic Violation Notice - {violation_data['license_plate']}"
+            }
             body = self.templates.violation_notice(violation_data)
-            msg.attach(MIMEText(body, 'plain'))
             
             # Attach violation image if available
+            attachments = []
             if image_path and Path(image_path).exists():
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-ID', '<violation_image>')
-                    msg.attach(img)
+                attachments.append(str(image_path))
             
             # Queue notification for sending
             self.notification_queue.put({
-                'msg': msg,
+                'headers': headers,
+                'body': body,
+                'attachments': attachments,
                 'recipient': violation_data['owner_email'],
                 'type': 'violation_notice',
                 'retry_count': 0
@@ -127,54 +138,157 @@ class NotificationManager:
         """Process notifications in the queue"""
         while True:
             try:
-                if not self.notification_queue.empty():
-                    notification = self.notification_queue.get()
-                    success = self._send_email(notification['msg'])
+                self._requeue_due_retries()
+                
+                try:
+                    notification = self.notification_queue.get(timeout=self._next_wakeup())
+                except Empty:
+                    if time.monotonic() - self._last_activity >= self.keepalive_interval:
+                        self._keepalive()
+                        self._last_activity = time.monotonic()
+                    continue
                     
-                    if not success and notification['retry_count'] < len(self.retry_delays):
-                        # Schedule retry
-                        retry_delay = self.retry_delays[notification['retry_count']]
-                        notification['retry_count'] += 1
-                        time.sleep(retry_delay)
-                        self.notification_queue.put(notification)
+                # Drain up to batch_size messages onto the same connection
+                batch = [notification]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.notification_queue.get_nowait())
+                    except Empty:
+                        break
+                        
+                for notification in batch:
+                    success = self._send_email(self._build_message(notification))
                     
-                time.sleep(1)  # Prevent busy waiting
+                    if not success and notification['retry_count'] < len(self.retry_delays):
+                        self._schedule_retry(notification)
+                        
+                self._last_activity = time.monotonic()
                 
             except Exception as e:
                 logger.error(f"Error processing notification queue: {e}")
                 time.sleep(5)  # Wait before retrying
                 
-    def _send_email(self, msg: MIMEMultipart) -> bool:
-        """Send email using SMTP"""
-        try:
-            with smtplib.SMTP(self.email_config['SMTP_SERVER'], 
-                            self.email_config['SMTP_PORT']) as server:
+    def _schedule_retry(self, notification: Dict):
+        """Park a failed notification until its retry delay has passed"""
+        retry_delay = self.retry_delays[notification['retry_count']]
+        notification['retry_count'] += 1
+        with self._retry_lock:
+            heapq.heappush(
+                self._retry_heap,
+                (time.monotonic() + retry_delay, next(self._retry_seq), notification)
+            )
+            
+    def _requeue_due_retries(self):
+        """Move retries whose delay has elapsed back onto the main queue"""
+        now = time.monotonic()
+        with self._retry_lock:
+            while self._retry_heap and self._retry_heap[0][0] <= now:
+                _, _, notification = heapq.heappop(self._retry_heap)
+                self.notification_queue.put(notification)
+                
+    def _next_wakeup(self) -> float:
+        """Seconds until the next retry is due or the keepalive is needed"""
+        idle_left = self.keepalive_interval - (time.monotonic() - self._last_activity)
+        timeout = max(0.0, idle_left)
+        with self._retry_lock:
+            if self._retry_heap:
+                timeout = min(timeout, max(0.0, self._retry_heap[0][0] - time.monotonic()))
+        return timeout
+        
+    def _ensure_smtp(self) -> smtplib.SMTP:
+        """Return the open SMTP connection, connecting and logging in if needed"""
+        if self._smtp is None:
+            server = smtplib.SMTP(self.email_config['SMTP_SERVER'],
+                                  self.email_config['SMTP_PORT'])
+            try:
                 server.starttls()
                 server.login(
                     self.email_config['SENDER_EMAIL'],
                     self.email_config['SENDER_PASSWORD']
                 )
-                server.send_message(msg)
-                logger.info(f"Email sent successfully to {msg['To']}")
-                return True
-                
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+        return self._smtp
+        
+    def _close_smtp(self):
+        """Drop the SMTP connection so the next send reconnects"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                # quit() only closes the socket when the server answered
+                self._smtp.close()
+            self._smtp = None
+            
+    def _keepalive(self):
+        """Send a NOOP so the server does not drop an idle connection"""
+        if self._smtp is None:
+            return
+        try:
+            code, _ = self._smtp.noop()
+            if code != 250:
+                self._close_smtp()
+        except (smtplib.SMTPException, OSError):
+            self._close_smtp()
+            
+    def _build_message(self, notification: Dict) -> MIMEMultipart:
+        """Assemble the MIME message, loading attachments from disk at send time"""
+        msg = MIMEMultipart()
+        for name, value in notification['headers'].items():
+            msg[name] = value
+        msg.attach(MIMEText(notification['body'], 'plain'))
+        
+        for image_path in notification.get('attachments', []):
+            try:
+                with open(image_path, 'rb') as f:
+                    img = MIMEImage(f.read())
+            except OSError as e:
+                logger.warning(f"Skipping attachment {image_path}: {e}")
+                continue
+            img.add_header('Content-ID', '<violation_image>')
+            msg.attach(img)
+            
+        return msg
+        
+    def _send_email(self, msg: MIMEMultipart) -> bool:
+        """Send email using SMTP"""
+        try:
+            try:
+                self._ensure_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Idle connection was closed by the server, reconnect once
+                self._close_smtp()
+                self._ensure_smtp().send_message(msg)
+            logger.info(f"Email sent successfully to {msg['To']}")
+            return True
+            
         except Exception as e:
             logger.error(f"Error sending email: {e}")
+            # Only a broken connection is dropped; per-message failures (refused
+            # recipient, rejected data) reset the session and it stays usable.
+            # SMTPException subclasses OSError, so socket errors are told apart explicitly
+            if isinstance(e, smtplib.SMTPServerDisconnected) or (
+                    isinstance(e, OSError) and not isinstance(e, smtplib.SMTPException)):
+                self._close_smtp()
             return False
             
     def send_fine_receipt(self, payment_data: Dict) -> bool:
         """Send fine payment receipt"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.email_config['SENDER_EMAIL']
-            msg['To'] = payment_data['email']
-            msg['Subject'] = f"Payment Receipt - Traffic Violation Fine"
+            headers = {
+                'From': self.email_config['SENDER_EMAIL'],
+                'To': payment_data['email'],
+                'Subject': f"Payment Receipt - Traffic Violation Fine"
+            }
             
             body = self.templates.fine_receipt(payment_data)
-            msg.attach(MIMEText(body, 'plain'))
             
             self.notification_queue.put({
-                'msg': msg,
+                'headers': headers,
+                'body': body,
+                'attachments': [],
                 'recipient': payment_data['email'],
                 'type': 'fine_receipt',
                 'retry_count': 0
@@ -191,6 +305,7 @@ class NotificationManager:
         """Get notification statistics"""
         return {
             'queue_size': self.notification_queue.qsize(),
+            'pending_retries': len(self._retry_heap),
             'notifications_sent': self._get_sent_count(),
             'failed_notifications': self._get_failed_count()
         }
@@ -5,20 +5,32 @@ Handles drawing boxes, labels, and information on frames.
 
 import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Visualizer:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Optional[Dict] = None):
         """Initialize visualizer with configuration"""
+        if config is None:
+            # Imported here since the package imports this module first
+            from . import UTIL_CONFIG
+            config = UTIL_CONFIG['visualization']
         self.config = config
         self.colors = config['colors']
         self.font = cv2.FONT_HERSHEY_SIMPLEX
         self.font_scale = config['font_scale']
         self.thickness = config['thickness']
         
+        # Text metrics depend only on the string once font settings are fixed
+        self._text_size_cache: Dict[str, Tuple[int, int]] = {}
+        self._text_size_cache_limit = 1024
+        
+        # Per-class box colors, looked up by class_id modulo the palette size
+        self._color_lut = np.array(list(self.colors.values()), dtype=np.uint8).reshape(-1, 3)
+        self._class_colors = [tuple(int(c) for c in row) for row in self._color_lut]
+        
     def draw_detection(self, 
                       frame: np.ndarray,
                       detection: Dict,
@@ -42,28 +54,84 @@ class Visualizer:
             logger.error(f"Error drawing detection: {e}")
             return frame
             
+    def draw_detections(self,
+                        image: np.ndarray,
+                        detections: List[Dict],
+                        violations: Optional[List[Dict]] = None) -> np.ndarray:
+        """Draw detections and violations on a copy of image"""
+        return self.annotate_into(np.empty_like(image), image, detections, violations)
+        
+    def annotate_into(self,
+                      dst: np.ndarray,
+                      src: np.ndarray,
+                      detections: List[Dict],
+                      violations: Optional[List[Dict]] = None) -> np.ndarray:
+        """Copy src into a caller-owned buffer and annotate it there"""
+        np.copyto(dst, src)
+        return self.draw_detections_inplace(dst, detections, violations)
+        
+    def draw_detections_inplace(self,
+                                image: np.ndarray,
+                                detections: List[Dict],
+                                violations: Optional[List[Dict]] = None) -> np.ndarray:
+        """Draw detections and violations directly on image
+        
+        Each bbox is (x1, y1, x2, y2), absolute or normalized to [0, 1], as in
+        draw_detection and check_violations.
+        """
+        num_colors = len(self._class_colors)
+        for detection in detections:
+            # A malformed detection is skipped without losing the rest
+            try:
+                x1, y1, x2, y2 = self._get_coordinates(detection['bbox'], image.shape)
+                color = self._class_colors[detection['class_id'] % num_colors]
+                cv2.rectangle(image, (x1, y1), (x2, y2), color, self.thickness)
+                name = detection.get('class_name') or detection['class_id']
+                self._draw_label(image, f"{name}: {detection['confidence']:.2f}", (x1, y1), color)
+            except Exception as e:
+                logger.error(f"Error drawing detection: {e}")
+                
+        if violations:
+            self.draw_violations(image, violations)
+        return image
+        
     def draw_violations(self, 
                        frame: np.ndarray,
                        violations: List[Dict]) -> np.ndarray:
         """Draw all violations on frame"""
         try:
-            for violation in violations:
-                # Draw violation box
-                frame = self.draw_detection(
-                    frame,
-                    violation,
-                    f"{violation['type']}: {violation['confidence']:.2f}",
-                    self.colors['red']
-                )
+            if not violations:
+                return frame
                 
+            # Convert every box in one pass, leaving only the draw calls in the loop
+            bboxes = [violation.get('bbox') for violation in violations]
+            try:
+                coords = self._get_coords_batch(bboxes, frame.shape).tolist()
+            except (TypeError, ValueError):
+                # A missing or ragged box: convert one at a time and skip only the bad ones
+                coords = [self._try_coordinates(bbox, frame.shape) for bbox in bboxes]
+            color = self.colors['red']
+            thickness = self.thickness
+            
+            for violation, box in zip(violations, coords):
+                # Draw violation box
+                if box is not None:
+                    x1, y1, x2, y2 = box
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
+                    self._draw_label(
+                        frame,
+                        f"{violation['type']}: {violation['confidence']:.2f}",
+                        (x1, y1),
+                        color
+                    )
+                    
                 # Draw license plate if available
                 if 'license_plate' in violation:
                     self._draw_plate_info(frame, violation)
                     
             # Draw summary
-            if violations:
-                self._draw_summary(frame, violations)
-                
+            self._draw_summary(frame, violations)
+            
             return frame
         except Exception as e:
             logger.error(f"Error drawing violations: {e}")
@@ -77,12 +145,7 @@ class Visualizer:
         """Draw text label on frame"""
         try:
             # Get text size
-            text_size = cv2.getTextSize(
-                text, 
-                self.font,
-                self.font_scale,
-                self.thickness
-            )[0]
+            text_size = self._get_text_size(text)
             
             # Draw background rectangle
             cv2.rectangle(
@@ -106,6 +169,21 @@ class Visualizer:
         except Exception as e:
             logger.error(f"Error drawing label: {e}")
             
+    def _get_text_size(self, text: str) -> Tuple[int, int]:
+        """Return the rendered label size, measuring each distinct string once"""
+        size = self._text_size_cache.get(text)
+        if size is None:
+            if len(self._text_size_cache) >= self._text_size_cache_limit:
+                self._text_size_cache.clear()
+            size = cv2.getTextSize(
+                text,
+                self.font,
+                self.font_scale,
+                self.thickness
+            )[0]
+            self._text_size_cache[text] = size
+        return size
+        
     def _draw_plate_info(self,
                         frame: np.ndarray,
                         violation: Dict):
@@ -174,6 +252,31 @@ class Visualizer:
             
         return x1, y1, x2, y2
         
+    def _try_coordinates(self,
+                         bbox: Union[List, Tuple, None],
+                         frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """Convert one bbox, logging and returning None if it is malformed"""
+        try:
+            return self._get_coordinates(bbox, frame_shape)
+        except Exception as e:
+            logger.error(f"Skipping malformed bbox: {e}")
+            return None
+            
+    @staticmethod
+    def _get_coords_batch(bboxes: Union[List, np.ndarray],
+                          frame_shape: Tuple[int, ...]) -> np.ndarray:
+        """Convert an (N, 4) array of bboxes to absolute int32 coordinates"""
+        height, width = frame_shape[:2]
+        arr = np.asarray(bboxes, dtype=np.float64)
+        
+        if arr.ndim != 2 or arr.shape[1] != 4:
+            raise ValueError("Invalid bbox format")
+            
+        # Rows whose values all lie in [0, 1] are normalized coordinates
+        normalized = arr.max(axis=1) <= 1.0
+        scale = np.where(normalized[:, None], np.array([width, height, width, height]), 1.0)
+        return (arr * scale).astype(np.int32)
+        
     def add_timestamp(self,
                      frame: np.ndarray,
                      timestamp: str) -> np.ndarray:
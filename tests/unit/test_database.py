@@ -1,19 +1,39 @@
 import pytest
 import sqlite3
+import importlib.util
 from datetime import datetime
-from src.utils.database import DatabaseManager
+from pathlib import Path
+from src.utils.database import DatabaseManager, VIOL_DTYPE
 
-@pytest.fixture
-def db_manager():
-    config = {
-        'database': {
-            'DB_PATH': ':memory:',
-            'POOL_SIZE': 1
-        }
+def _load_app_constants():
+    # Loaded by path: importing the src.config package writes config.yaml at import time
+    path = Path(__file__).resolve().parents[2] / 'src' / 'config' / 'constants.py'
+    spec = importlib.util.spec_from_file_location('app_constants', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+APP_DATABASE_CONFIG = _load_app_constants().DATABASE_CONFIG
+
+DB_CONFIG = {
+    'database': {
+        'DB_PATH': ':memory:',
+        'POOL_SIZE': 1
     }
-    manager = DatabaseManager(config)
-    manager.setup_database()
-    return manager
+}
+
+@pytest.fixture(scope="session")
+def db_template():
+    # Schema is built once and copied into each test's database
+    template = DatabaseManager(DB_CONFIG)
+    yield template
+    template.close()
+
+@pytest.fixture
+def db_manager(db_template):
+    manager = DatabaseManager(DB_CONFIG, template=db_template)
+    yield manager
+    manager.close()
 
 @pytest.fixture
 def sample_owner():
@@ -76,6 +96,18 @@ class TestDatabaseManager:
         assert len(pending) > 0
         assert pending[0]['license_plate'] == sample_violation['license_plate']
         
+    def test_get_pending_violations_array(self, db_manager, sample_owner, sample_violation):
+        """Test getting pending violations as a structured array"""
+        db_manager.add_vehicle_owner(sample_owner)
+        db_manager.record_violations([sample_violation] * 3)
+        
+        pending = db_manager.get_pending_violations_array()
+        assert pending.dtype == VIOL_DTYPE
+        assert len(pending) == 3
+        assert (pending['license_plate'] == sample_violation['license_plate']).all()
+        assert pending['fine'].sum() == pytest.approx(3 * sample_violation['fine_amount'])
+        assert not pending['processed'].any()
+        
     def test_mark_violation_processed(self, db_manager, sample_owner, sample_violation):
         """Test marking violation as processed"""
         # Setup test data
@@ -123,15 +155,69 @@ class TestDatabaseManager:
         violation = db_manager.get_violation(violation_id)
         assert violation['payment_status'] == 'paid'
         
+    def test_upgrades_existing_database(self, tmp_path, sample_owner, sample_violation):
+        """Test a database created by an earlier schema gains the new columns"""
+        db_path = tmp_path / 'traffic.db'
+        conn = sqlite3.connect(db_path)
+        conn.execute('''
+            CREATE TABLE violations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                license_plate TEXT,
+                violation_type TEXT,
+                fine_amount REAL,
+                date_time TIMESTAMP,
+                image_path TEXT,
+                processed INTEGER DEFAULT 0
+            )
+        ''')
+        conn.execute(
+            "INSERT INTO violations (license_plate, violation_type, fine_amount, image_path) "
+            "VALUES ('OLD001', 'no_helmet', 500.0, 'old.jpg')"
+        )
+        conn.commit()
+        conn.close()
+        
+        manager = DatabaseManager({'DB_PATH': db_path, 'POOL_SIZE': 1})
+        try:
+            manager.add_vehicle_owner(sample_owner)
+            violation_id = manager.record_violation(sample_violation)
+            
+            pending = manager.get_pending_violations()
+            assert [v['license_plate'] for v in pending] == ['OLD001', sample_violation['license_plate']]
+            assert pending[0]['location'] is None
+            
+            assert manager.get_violation(1)['payment_status'] == 'pending'
+            assert manager.record_payment({
+                'violation_id': violation_id,
+                'amount': sample_violation['fine_amount'],
+                'payment_method': 'credit_card',
+                'transaction_id': 'TXN456'
+            })
+        finally:
+            manager.close()
+        
+    def test_app_config_records_unknown_plate(self, tmp_path, sample_violation):
+        """Test the shipped database config accepts a plate with no registered owner"""
+        config = {'database': {**APP_DATABASE_CONFIG, 'DB_PATH': tmp_path / 'traffic.db'}}
+        manager = DatabaseManager(config)
+        try:
+            violation_id = manager.record_violation(sample_violation)
+            violation = manager.get_violation(violation_id)
+            assert violation['license_plate'] == sample_violation['license_plate']
+        finally:
+            manager.close()
+        
     def test_concurrent_access(self, db_manager, sample_violation):
         """Test concurrent database access"""
         import threading
         
         def record_violations():
+            violations = []
             for i in range(10):
                 violation = sample_violation.copy()
                 violation['license_plate'] = f"TEST{i}"
-                db_manager.record_violation(violation)
+                violations.append(violation)
+            db_manager.record_violations(violations)
                 
         # Create multiple threads
         threads = [
@@ -154,4 +240,15 @@ class TestDatabaseManager:
         'triple_riding',
         'no_license_plate'
     ])
-    def test_different_violation_types(self, db_
\ No newline at end of file
+    def test_different_violation_types(self, db_manager, sample_owner, sample_violation, violation_type):
+        """Test recording each violation type"""
+        db_manager.add_vehicle_owner(sample_owner)
+        violation = sample_violation.copy()
+        violation['violation_type'] = violation_type
+        
+        violation_id = db_manager.record_violation(violation)
+        
+        recorded = db_manager.get_violation(violation_id)
+        assert recorded['violation_type'] == violation_type
+        stats = db_manager.get_violation_statistics()
+        assert stats['violations_by_type'] == {violation_type: 1}
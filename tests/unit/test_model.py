@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+from src.core.model import YOLOModel
+from src.core.detector import ViolationDetector
+
+NUM_SLOTS = 100
+
+class StubSession:
+    """Returns fixed outputs shaped like the frozen Object Detection graph"""
+    
+    def __init__(self, detections):
+        # detections: (ymin, xmin, ymax, xmax, score, class_id) rows
+        self.boxes = np.zeros((1, NUM_SLOTS, 4), dtype=np.float32)
+        self.scores = np.zeros((1, NUM_SLOTS), dtype=np.float32)
+        self.classes = np.zeros((1, NUM_SLOTS), dtype=np.float32)
+        for i, (*box, score, class_id) in enumerate(detections):
+            self.boxes[0, i] = box
+            self.scores[0, i] = score
+            self.classes[0, i] = class_id
+    
+    def run(self, fetches, feed_dict):
+        return self.boxes, self.scores, self.classes
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def stub_session(monkeypatch):
+    session = StubSession([
+        (0.1, 0.25, 0.5, 0.75, 0.9, 2),    # without_helmet
+        (0.2, 0.2, 0.9, 0.8, 0.3, 3),      # motorcycle below threshold
+    ])
+    
+    def load_model(self):
+        self.session = session
+        self.image_tensor = 'image_tensor:0'
+        self.boxes_t = 'detection_boxes:0'
+        self.scores_t = 'detection_scores:0'
+        self.classes_t = 'detection_classes:0'
+        return None
+    
+    monkeypatch.setattr(YOLOModel, '_load_model', load_model)
+    return session
+
+class TestYOLOModel:
+    def test_detect_decodes_graph_outputs(self, stub_session):
+        """Test normalized yx boxes become pixel (x, y, w, h) boxes"""
+        model = YOLOModel({
+            'MODEL_PATH': 'stub.pb',
+            'CONFIDENCE_THRESHOLD': 0.5,
+            'NMS_THRESHOLD': 0.4
+        })
+        image = np.zeros((200, 400, 3), dtype=np.uint8)
+        
+        detections = model.detect(image)
+        
+        assert len(detections) == 1
+        assert detections.boxes[0].tolist() == [100, 20, 200, 80]
+        assert detections.scores[0] == pytest.approx(0.9)
+        assert detections.class_ids[0] == 2
+    
+    def test_detect_scales_to_original_shape(self, stub_session):
+        """Test boxes are scaled to image_shape rather than the model input"""
+        model = YOLOModel({
+            'MODEL_PATH': 'stub.pb',
+            'CONFIDENCE_THRESHOLD': 0.5,
+            'NMS_THRESHOLD': 0.4
+        })
+        resized = np.zeros((416, 416, 3), dtype=np.uint8)
+        
+        detections = model.detect(resized, image_shape=(1080, 1920))
+        
+        assert detections.boxes[0].tolist() == [480, 108, 960, 432]
+    
+    def test_violation_detector_on_stubbed_session(self, stub_session):
+        """Test label map ids resolve to helmet.names entries end to end"""
+        detector = ViolationDetector({
+            'MODEL_PATH': 'stub.pb',
+            'LABEL_MAP_PATH': 'models/yolo/data/helmet.names',
+            'MIN_CONFIDENCE': 0.5
+        })
+        image = np.zeros((200, 400, 3), dtype=np.uint8)
+        
+        detections = detector.detect_objects(image)
+        assert [d['class_name'] for d in detections] == ['without_helmet']
+        # Dict boxes are corners, the same convention as violations
+        assert detections[0]['bbox'] == (100, 20, 300, 100)
+        
+        violations = detector.check_violations(detections)
+        assert [v['type'] for v in violations] == ['no_helmet']
+        assert violations[0]['bbox'] == (100, 20, 300, 100)
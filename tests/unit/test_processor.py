@@ -0,0 +1,79 @@
+import pytest
+import cv2
+import numpy as np
+from src.core.processor import ImageProcessor, VideoProcessor, NUMBA_AVAILABLE
+
+# The reference resizes in uint8 fixed point, so pixels may differ by up to one gray level
+PREPROCESS_ATOL = 1.0 / 255.0
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+
+class TestPreprocess:
+    @pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba required")
+    @pytest.mark.parametrize("size", [(64, 48), (416, 416)])
+    def test_fused_matches_blob_from_image(self, frame, size):
+        """Test the fused kernel agrees with the blobFromImage path"""
+        fused = ImageProcessor({'IMAGE_SIZE': size})
+        assert fused.fused
+        
+        result = fused.preprocess(frame)
+        reference = cv2.dnn.blobFromImage(
+            frame, 1.0 / 255.0, size, swapRB=True, crop=False
+        )[0].transpose(1, 2, 0)
+        
+        assert result.shape == reference.shape
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, reference, atol=PREPROCESS_ATOL)
+    
+    def test_unfused_path_matches_blob_from_image(self, frame):
+        """Test the fallback path returns the blobFromImage result in HWC order"""
+        processor = ImageProcessor({'IMAGE_SIZE': (64, 48), 'FUSED_PREPROCESS': False})
+        assert not processor.fused
+        
+        result = processor.preprocess(frame)
+        reference = cv2.dnn.blobFromImage(
+            frame, 1.0 / 255.0, (64, 48), swapRB=True, crop=False
+        )[0].transpose(1, 2, 0)
+        
+        np.testing.assert_array_equal(result, reference)
+
+
+class TestFrameBuffer:
+    @pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+    def test_average_matches_window_mean(self, dtype):
+        """Test the rolling average equals np.mean over the last BUFFER_SIZE frames"""
+        processor = VideoProcessor({'BUFFER_SIZE': 4})
+        rng = np.random.default_rng(1)
+        frames = [
+            rng.integers(0, 256, size=(8, 6, 3)).astype(dtype)
+            for _ in range(11)
+        ]
+        
+        for i, frame in enumerate(frames, start=1):
+            processor.update_buffer(frame)
+            window = np.stack(frames[max(0, i - 4):i])
+            expected = np.mean(window, axis=0).astype(np.uint8)
+            np.testing.assert_array_equal(processor.get_buffer_average(), expected)
+    
+    def test_empty_buffer_has_no_average(self):
+        """Test no average is reported before the first frame"""
+        processor = VideoProcessor({'BUFFER_SIZE': 4})
+        assert processor.get_buffer_average() is None
+
+
+class TestAugmentation:
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_normalized_output_stays_in_unit_range(self, frame, dtype):
+        """Test brightness and contrast never push normalized pixels outside [0, 1]"""
+        processor = ImageProcessor({'IMAGE_SIZE': (64, 48), 'AUGMENTATION': True, 'SEED': 0})
+        image = processor.preprocess(frame).astype(dtype)
+        
+        # Enough draws to hit every brightness/contrast combination
+        for _ in range(50):
+            augmented = processor.apply_augmentation(image.copy())
+            assert augmented.shape == image.shape
+            assert augmented.min() >= 0.0
+            assert augmented.max() <= 1.0
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+from src.core.workers import WorkerPool, split_cores
+
+@pytest.fixture
+def pool():
+    # Workers are never started; submit/get_result are replaced per test
+    pool = WorkerPool({}, num_workers=2, cores=[0, 1])
+    yield pool
+    pool.close()
+
+class TestSplitCores:
+    def test_even_split(self):
+        """Test cores are split into equal contiguous groups"""
+        assert split_cores(2, cores=[0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    
+    def test_remainder_goes_to_first_groups(self):
+        """Test leftover cores are spread over the first groups"""
+        groups = split_cores(3, cores=range(8))
+        assert [len(group) for group in groups] == [3, 3, 2]
+        assert sum(groups, []) == list(range(8))
+    
+    def test_workers_capped_by_cores(self):
+        """Test more workers than cores gives one core per worker"""
+        assert split_cores(8, cores=[4, 2]) == [[2], [4]]
+    
+    def test_at_least_one_worker(self):
+        """Test a zero worker request still gets a group"""
+        assert split_cores(0, cores=[0, 1]) == [[0, 1]]
+
+class TestWorkerPool:
+    def test_map_batches_preserves_order(self, pool):
+        """Test results come back in input order whatever the completion order"""
+        batches = [
+            [np.zeros((4, 4, 3), dtype=np.uint8)] * size
+            for size in (1, 3, 2)
+        ]
+        submitted = []
+        pool.submit = lambda batch_id, frames: submitted.append((batch_id, len(frames)))
+        
+        # Finish batches in reverse submission order
+        def get_result(timeout=None):
+            batch_id, size = submitted.pop()
+            return batch_id, [f"batch{batch_id}"] * size
+        pool.get_result = get_result
+        
+        results = pool.map_batches(batches)
+        assert results == [["batch0"], ["batch1"] * 3, ["batch2"] * 2]
+    
+    def test_model_load_failure_is_reported(self):
+        """Test a worker that cannot load the model raises instead of hanging"""
+        config = {
+            'MODEL_PATH': 'models/weights/missing.pb',
+            'CONFIDENCE_THRESHOLD': 0.5,
+            'NMS_THRESHOLD': 0.4
+        }
+        with WorkerPool(config, num_workers=1, cores=[0]) as pool:
+            with pytest.raises(RuntimeError):
+                pool.get_result(timeout=120)